@@ -47,4 +47,10 @@ class CartResponse(BaseModel):
     total_price: float
     
     model_config = ConfigDict(from_attributes=True)
-    
\ No newline at end of file
+
+
+class CartSummaryResponse(BaseModel):
+    """Cart totals without line items"""
+    total_items: int
+    total_quantity: int
+    total_price: float
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field, ConfigDict
@@ -47,8 +48,12 @@ class OrderResponse(BaseModel):
     # Order List Response
 class OrderListResponse(BaseModel):
     """paginated order list"""
-    total: int
+    total: Optional[int] = None  # only when requested with include_total
+    has_next: bool = False
     orders: list[OrderResponse]
+    # Keyset cursor for the next page; None on the last page
+    next_before: Optional[datetime] = None
+    next_before_id: Optional[UUID] = None
     
     
 # Order Status Update (for sellers/admins)
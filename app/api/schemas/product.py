@@ -72,8 +72,8 @@ class ProductResponse(ProductBase):
     seller_id: UUID
     seller: SellerInfo
     category: Optional[CategoryResponse] = None
-    average_rating: Optional[CategoryResponse] = None
-    total_review: int = 0
+    average_rating: Optional[float] = None
+    total_reviews: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -84,13 +84,16 @@ class ProductResponse(ProductBase):
 # Paginated List
 
 class ProductListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None  # only when requested with include_total
+    has_next: bool = False
+    next_cursor: Optional[str] = None  # keyset cursor for the next page
     products: list[ProductResponse]
     
     
 #Schema for paginated category list
 class CategoryListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None  # only when requested with include_total
+    has_next: bool = False
     categories: list[CategoryResponse]
     
     
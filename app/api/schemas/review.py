@@ -50,6 +50,7 @@ class ReviewResponse(ReviewBase):
 class ReviewListResponse(BaseModel):
     """Paginated review list"""
     total: int
+    has_next: bool = False
     average_rating: Optional[float]
     rating_distribution: dict[int, int]  # {5: 10, 4: 5, 3: 2, 2: 1, 1: 0}
     reviews: list[ReviewResponse]
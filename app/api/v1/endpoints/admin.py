@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, status, HTTPException
 from sqlalchemy import select, func, text, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_current_admin
+from app.core.security import get_current_admin, invalidate_cached_users
 from app.database.models import User
 from app.database.session import get_session
+from app.services.review_service import ReviewService
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -16,7 +20,7 @@ async def count_users(
     current_admin: User = Depends(get_current_admin),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(func.count(User.id)))
+    result = await session.execute(select(func.count()).select_from(User))
     count = result.scalar()
     return {"total_users": count}
 
@@ -25,25 +29,46 @@ async def count_users(
 
 @router.get("/users/list")
 async def list_all_users(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    after_id: Optional[UUID] = Query(None, description="Keyset cursor: last user id of previous page"),
     current_admin: User = Depends(get_current_admin),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(User))
-    users = result.scalars().all()
+    # Fetch one extra row to learn whether another page exists
+    query = select(User).order_by(User.id).limit(limit + 1)
+
+    # Keyset cursor takes precedence over offset
+    if after_id:
+        query = query.where(User.id > after_id)
+    else:
+        query = query.offset(skip)
+
+    users = []
+    async for user in await session.stream_scalars(query):
+        users.append({
+            "id": str(user.id),
+            "email": user.email,
+            "full_name": user.full_name,
+            "role": user.role,
+            "is_active": user.is_active,
+            "created_at": user.created_at.isoformat()
+        })
+
+    has_next = len(users) > limit
+    users = users[:limit]
+
+    # Planner estimate instead of a full COUNT(*) scan; -1 until the
+    # table has been analyzed, reported as unknown
+    estimate = await session.scalar(
+        text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'users'")
+    )
 
     return {
-        "total": len(users),
-        "users": [
-            {
-                "id": str(user.id),
-                "email": user.email,
-                "full_name": user.full_name,
-                "role": user.role,
-                "is_active": user.is_active,
-                "created_at": user.created_at.isoformat()
-            }
-            for user in users
-        ]
+        "total_estimate": estimate if estimate is not None and estimate >= 0 else None,
+        "has_next": has_next,
+        "next_cursor": users[-1]["id"] if has_next else None,
+        "users": users
     }
 
 
@@ -51,24 +76,24 @@ async def list_all_users(
 
 @router.get("/users/duplicates")
 async def find_duplicates(
+    limit: int = Query(1000, ge=1, le=10000),
     current_admin: User = Depends(get_current_admin),
     session: AsyncSession = Depends(get_session)
 ):
     query = text("""
-        SELECT email, COUNT(*) AS count
+        SELECT email, COUNT(*)::int AS count
         FROM users
         GROUP BY email
         HAVING COUNT(*) > 1
+        ORDER BY count DESC
+        LIMIT :limit
     """)
-    result = await session.execute(query)
-    duplicates = result.fetchall()
 
-    return {
-        "duplicates": [
-            {"email": row.email, "count": row.count}
-            for row in duplicates
-        ]
-    }
+    duplicates = []
+    async for row in await session.stream(query, {"limit": limit}):
+        duplicates.append({"email": row.email, "count": row.count})
+
+    return {"duplicates": duplicates}
 
 
 # REMOVE DUPLICATES KEEPING NEWEST
@@ -78,20 +103,30 @@ async def remove_duplicates(
     current_admin: User = Depends(get_current_admin),
     session: AsyncSession = Depends(get_session)
 ):
-    # Get all duplicates with newest id
+    # Serialize concurrent dedup runs for the rest of this transaction
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext('users_dedup'))")
+    )
+
+    # Keep the newest row per email; join-delete instead of IN (subquery)
     query = text("""
         WITH ranked AS (
             SELECT 
-                id, email,
+                id,
                 ROW_NUMBER() OVER (PARTITION BY email ORDER BY created_at DESC) AS rn
             FROM users
         )
-        DELETE FROM users 
-        WHERE id IN (SELECT id FROM ranked WHERE rn > 1)
+        DELETE FROM users u
+        USING ranked r
+        WHERE u.id = r.id AND r.rn > 1
+        RETURNING u.id
     """)
 
-    await session.execute(query)
+    result = await session.execute(query)
+    deleted_ids = list(result.scalars().all())
+    # Commit before invalidating so a concurrent request can't re-cache the rows
     await session.commit()
+    await invalidate_cached_users(deleted_ids)
     return None
 
 
@@ -110,9 +145,36 @@ async def delete_all_users(
         )
 
     # Avoid deleting the current admin
-    await session.execute(
-        delete(User).where(User.id != current_admin.id)
+    result = await session.execute(
+        delete(User).where(User.id != current_admin.id).returning(User.id)
     )
+    deleted_ids = list(result.scalars().all())
     await session.commit()
-
+    await invalidate_cached_users(deleted_ids)
     return None
+
+
+# RECOUNT PRODUCT RATING
+
+@router.post("/products/{product_id}/recount-rating")
+async def recount_product_rating(
+    product_id: UUID,
+    current_admin: User = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session)
+):
+    """Recompute a product's stored rating from its reviews (fixes drift)."""
+    service = ReviewService(session)
+    stats = await service.update_product_rating(product_id)
+
+    if stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+
+    average_rating, total_reviews = stats
+    return {
+        "product_id": str(product_id),
+        "average_rating": round(average_rating, 2) if average_rating is not None else None,
+        "total_reviews": total_reviews
+    }
@@ -4,7 +4,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.api.schemas.user import UserCreate,  UserResponse, TokenResponse
-from app.core.security import create_access_token
+from app.core.responses import ORJSONResponse
+from app.core.security import create_access_token_async
+from app.database.models import UserRole
 from app.database.session import get_session
 from app.services.user_service import UserService
 
@@ -38,13 +40,26 @@ async def login(
             detail="Incorrect email or password"
         )
 
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = await create_access_token_async(data={"sub": user.id})
 
-    return TokenResponse(
+    # User was just loaded from the DB: build the DTOs without validation
+    user_response = UserResponse.model_construct(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        phone=user.phone,
+        role=user.role,
+        is_active=user.is_active,
+        is_verified=user.is_verified,
+        created_at=user.created_at
+    )
+    token = TokenResponse.model_construct(
         access_token=access_token,
         token_type="bearer",
-        user=UserResponse.model_validate(user)
+        user=user_response
     )
+    # Returned directly so FastAPI skips response_model re-validation
+    return ORJSONResponse(token.model_dump())
 
 
 @router.post("/register/buyer", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -55,7 +70,7 @@ async def register_buyer(
     """
     Quick register buyer with auto role = 'buyer'
     """
-    user_data = user_data.model_copy(update={"role": "buyer"})
+    user_data.role = UserRole.BUYER  # request-scoped model, no copy needed
     service = UserService(session)
     return await service.create_user(user_data)
 
@@ -68,6 +83,6 @@ async def register_seller(
     """
     Quick register seller with auto role = 'seller'
     """
-    user_data = user_data.model_copy(update={"role": "seller"})
+    user_data.role = UserRole.SELLER  # request-scoped model, no copy needed
     service = UserService(session)
     return await service.create_user(user_data)
@@ -7,15 +7,46 @@ from app.api.schemas.cart import (
     CartItemCreate,
     CartItemUpdate,
     CartItemResponse,
-    CartResponse
+    CartResponse,
+    CartSummaryResponse,
+    ProductInCart
 )
+from app.core.responses import ORJSONResponse
 from app.core.security import get_current_buyer
-from app.database.models import User, Product
+from app.database.models import User
 from app.database.session import get_session
 from app.services.cart_service import CartService
 
 router = APIRouter(prefix="/cart", tags=["Shopping Cart"])
 
+# Every field is always passed to model_construct, so the fields-set is
+# known up front and doesn't need rebuilding per instance
+_CART_ITEM_FIELDS = frozenset(CartItemResponse.model_fields)
+_PRODUCT_IN_CART_FIELDS = frozenset(ProductInCart.model_fields)
+
+
+def build_cart_item_response(item) -> CartItemResponse:
+    """Convert CartItem (with loaded product) → CartItemResponse without validation."""
+    product = item.product
+
+    return CartItemResponse.model_construct(
+        _CART_ITEM_FIELDS,
+        id=item.id,
+        quantity=item.quantity,
+        product=ProductInCart.model_construct(
+            _PRODUCT_IN_CART_FIELDS,
+            id=product.id,
+            name=product.name,
+            price=product.price,
+            stock=product.stock,
+            image_urls=product.image_urls,
+        ),
+        subtotal=product.price * item.quantity,
+        created_at=item.created_at,
+        updated_at=item.updated_at
+    )
+
+
 @router.get("/",response_model=CartResponse)
 async def get_cart(
     current_user: User = Depends(get_current_buyer),
@@ -30,30 +61,36 @@ async def get_cart(
     cart_items = await service.get_user_cart(current_user.id)
     
     #Calculate totals
-    item_with_subtotal = []
-    total_price  = 0.0
-    
-    for item in cart_items:
-        product = await session.get(Product, item.product_id)
-        subtotal = product.price * item.quantity
-        total_price += subtotal
-        
-        # Create response with subtotal
-        item_response = CartItemResponse(
-            id=item.id,
-            quantity=item.quantity,
-            product=item.product,
-            subtotal=subtotal,
-            created_at=item.created_at,
-            updated_at=item.updated_at
-        )
-        item_with_subtotal.append(item_response)
+    item_with_subtotal = [build_cart_item_response(item) for item in cart_items]
+    total_price = sum((item.subtotal for item in item_with_subtotal), 0.0)
         
-    return CartResponse(
+    cart = CartResponse.model_construct(
         items=item_with_subtotal,
         total_items=len(cart_items),
         total_price=total_price
     )
+    # Returned directly so FastAPI skips jsonable_encoder + re-validation
+    return ORJSONResponse(cart.model_dump())
+    
+@router.get("/summary", response_model=CartSummaryResponse)
+async def get_cart_summary(
+    current_user: User = Depends(get_current_buyer),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Get cart totals only (item count, quantity, price)
+    
+    Aggregated in a single SQL query, no line items are loaded
+    """
+    service = CartService(session)
+    total_items, total_quantity, total_price = await service.get_cart_totals(current_user.id)
+    
+    return ORJSONResponse({
+        "total_items": total_items,
+        "total_quantity": total_quantity,
+        "total_price": total_price,
+    })
+    
     
 @router.post("/", response_model=CartItemResponse, status_code=status.HTTP_201_CREATED)
 async def add_to_cart(
@@ -69,17 +106,9 @@ async def add_to_cart(
     service = CartService(session)
     cart_item = await service.add_to_cart(cart_data, current_user)
     
-    #Calculate subtotal
-    product = await session.get(Product, cart_item.product_id)
-    subtotal = product.price * cart_item.quantity
-    
-    return CartItemResponse(
-        id=cart_item.id,
-        quantity=cart_item.quantity,
-        product=cart_item.product,
-        subtotal=subtotal,
-        created_at=cart_item.created_at,
-        updated_at=cart_item.updated_at
+    return ORJSONResponse(
+        build_cart_item_response(cart_item).model_dump(),
+        status_code=status.HTTP_201_CREATED
     )
     
     
@@ -100,18 +129,7 @@ async def update_cart_item(
         current_user
     )
     
-    #Claculate subtotal
-    product = await session.get(Product,cart_item.product_id)
-    subtotal = product.price * cart_item.quantity
-    
-    return CartItemResponse(
-        id=cart_item.id,
-        quantity=cart_item.quantity,
-        product=cart_item.product,
-        subtotal=subtotal,
-        created_at=cart_item.created_at,
-        updated_at=cart_item.updated_at
-    )
+    return ORJSONResponse(build_cart_item_response(cart_item).model_dump())
     
     
 @router.delete("/{cart_item_id}", status_code=status.HTTP_204_NO_CONTENT)
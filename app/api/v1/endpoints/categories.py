@@ -1,32 +1,93 @@
+import logging
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, Response, status, HTTPException
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schemas.product import CategoryCreate, CategoryResponse,CategoryListResponse
+from app.core.http_cache import etag_matches, make_etag, not_modified
 from app.core.security import get_current_admin
 from app.database.models import User
+from app.database.redis import get_redis
 from app.database.session import get_session
 from app.services.category_service import CategoryService
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
+logger = logging.getLogger(__name__)
+
+# Redis hash holding serialized list pages, one field per (skip, limit, include_total)
+CATEGORY_LIST_CACHE_KEY = "cache:categories:list"
+CATEGORY_LIST_CACHE_TTL = 300  # seconds
+CATEGORY_LIST_CACHE_CONTROL = "public, max-age=60"
+
+
+async def invalidate_category_list(redis: Redis) -> None:
+    """Drop the cached list pages after a committed category write."""
+    try:
+        await redis.delete(CATEGORY_LIST_CACHE_KEY)
+    except RedisError:
+        # The write already committed; stale pages expire within the TTL
+        logger.warning("Could not clear %s", CATEGORY_LIST_CACHE_KEY, exc_info=True)
+
 
 @router.get("/", response_model=CategoryListResponse)
 async def list_categories(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    session: AsyncSession = Depends(get_session)
+    include_total: bool = Query(False, description="Also count all categories"),
+    session: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis)
 ):
     """
     List all categories (public endpoint)
+
+    Pages are cached in Redis and cleared whenever a category changes;
+    if Redis is unavailable the page is built from the database.
+    The ETag is derived from the serialized page, so conditional GETs
+    get a 304 without touching the database on a cache hit.
     """
-    service = CategoryService(session)
-    categories, total = await service.get_all(skip=skip, limit=limit)
+    field = f"{skip}:{limit}:{int(include_total)}"
+    redis_ok = True
+    try:
+        body = await redis.hget(CATEGORY_LIST_CACHE_KEY, field)
+    except RedisError:
+        # Serve from the database while Redis is unavailable
+        logger.warning("Category list cache read failed", exc_info=True)
+        body = None
+        redis_ok = False
+
+    if body is None:
+        service = CategoryService(session)
+        categories, has_next, total = await service.get_all(
+            skip=skip, limit=limit, include_total=include_total
+        )
 
-    return CategoryListResponse(
-        total=total,
-        categories=categories
+        body = CategoryListResponse.model_validate(
+            {"total": total, "has_next": has_next, "categories": categories},
+            from_attributes=True
+        ).model_dump_json()
+
+        if redis_ok:
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(CATEGORY_LIST_CACHE_KEY, field, body)
+                    pipe.expire(CATEGORY_LIST_CACHE_KEY, CATEGORY_LIST_CACHE_TTL)
+                    await pipe.execute()
+            except RedisError:
+                logger.warning("Category list cache write failed", exc_info=True)
+
+    etag = make_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag, CATEGORY_LIST_CACHE_CONTROL)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CATEGORY_LIST_CACHE_CONTROL}
     )
 
 
@@ -51,11 +112,16 @@ async def get_category(
 async def create_category(
     category_data: CategoryCreate,
     current_admin: User = Depends(get_current_admin),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis)
 ):
     """Create a new category (admin only)"""
     service = CategoryService(session)
-    return await service.create(category_data)
+    category = await service.create(category_data)
+    # Commit before invalidating so a concurrent list can't re-cache stale rows
+    await session.commit()
+    await invalidate_category_list(redis)
+    return category
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
@@ -63,22 +129,29 @@ async def update_category(
     category_id: UUID,
     category_data: CategoryCreate,
     current_admin: User = Depends(get_current_admin),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis)
 ):
     """Update a category (admin only)"""
     service = CategoryService(session)
-    return await service.update(category_id, category_data)
+    category = await service.update(category_id, category_data)
+    await session.commit()
+    await invalidate_category_list(redis)
+    return category
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_category(
     category_id: UUID,
     current_admin: User = Depends(get_current_admin),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis)
 ):
     """Delete a category (admin only).
     Cannot delete if category has products.
     """
     service = CategoryService(session)
     await service.delete(category_id)
+    await session.commit()
+    await invalidate_category_list(redis)
     return None
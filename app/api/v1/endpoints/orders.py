@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
@@ -11,6 +12,7 @@ from app.api.schemas.order import (
     OrderStatusUpdate,
     OrderItemResponse,
 )
+from app.core.responses import ORJSONResponse
 from app.core.security import get_current_buyer, get_current_admin
 from app.database.models import User, OrderStatus
 from app.database.session import get_session
@@ -18,6 +20,11 @@ from app.services.order_service import OrderService
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+# Every field is always passed to model_construct, so the fields-set is
+# known up front and doesn't need rebuilding per instance
+_ORDER_FIELDS = frozenset(OrderResponse.model_fields)
+_ORDER_ITEM_FIELDS = frozenset(OrderItemResponse.model_fields)
+
 
 def build_order_response(order) -> OrderResponse:
     """Convert Order SQLAlchemy model → OrderResponse schema."""
@@ -26,18 +33,21 @@ def build_order_response(order) -> OrderResponse:
     for item in order.items:
         product = item.product  # cache to avoid repeated access
 
+        # Trusted DB data: model_construct skips validation
         items_responses.append(
-            OrderItemResponse(
+            OrderItemResponse.model_construct(
+                _ORDER_ITEM_FIELDS,
                 id=item.id,
                 product_id=item.product_id,
                 product_name=product.name if product else None,
                 quantity=item.quantity,
                 price_at_purchase=item.price_at_purchase,
-                subtotal=item.price_at_purchase * item.quantity,
+                subtotal=item.subtotal,
             )
         )
 
-    return OrderResponse(
+    return OrderResponse.model_construct(
+        _ORDER_FIELDS,
         id=order.id,
         order_number=order.order_number,
         status=order.status,
@@ -52,6 +62,48 @@ def build_order_response(order) -> OrderResponse:
     )
 
 
+def build_order_dict(order) -> dict:
+    """Convert Order model → plain dict for list responses (no Pydantic pass)."""
+
+    items = [
+        {
+            "id": item.id,
+            "product_id": item.product_id,
+            "product_name": item.product.name if item.product else None,
+            "quantity": item.quantity,
+            "price_at_purchase": item.price_at_purchase,
+            "subtotal": item.subtotal,
+        }
+        for item in order.items
+    ]
+
+    return {
+        "id": order.id,
+        "order_number": order.order_number,
+        "status": order.status,
+        "total_amount": order.total_amount,
+        "shipping_address": order.shipping_address,
+        "shipping_city": order.shipping_city,
+        "shipping_zip": order.shipping_zip,
+        "shipping_phone": order.shipping_phone,
+        "items": items,
+        "created_at": order.created_at,
+        "updated_at": order.updated_at,
+    }
+
+
+def build_order_page(orders, has_next, next_cursor=None, total=None) -> dict:
+    """Order list body: orders plus the keyset cursor and optional total."""
+    next_before, next_before_id = next_cursor or (None, None)
+    return {
+        "total": total,
+        "has_next": has_next,
+        "orders": [build_order_dict(order) for order in orders],
+        "next_before": next_before,
+        "next_before_id": next_before_id,
+    }
+
+
 
 # BUYER ROUTES
 
@@ -64,26 +116,45 @@ async def checkout(
     """Checkout — create order from user's cart."""
     service = OrderService(session)
     order = await service.checkout(checkout_data, current_user)
-    return build_order_response(order)
+    return ORJSONResponse(
+        build_order_response(order).model_dump(),
+        status_code=status.HTTP_201_CREATED,
+    )
 
 
 @router.get("/my-orders", response_model=OrderListResponse)
 async def get_my_orders(
-    skip: int = Query(0, ge=0),
+    before: Optional[datetime] = Query(None, description="Cursor: created_at of the last order seen"),
+    before_id: Optional[UUID] = Query(None, description="Cursor: id of the last order seen"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Offset pagination; use before/before_id"),
     limit: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(False, description="Also count all matching orders"),
     current_user: User = Depends(get_current_buyer),
     session: AsyncSession = Depends(get_session),
 ):
-    """Get all orders belonging to the current user."""
+    """Get all orders belonging to the current user.
+
+    Keyset pagination: pass next_before/next_before_id from the previous
+    page as before/before_id. skip still works for older clients.
+    The total is only counted with include_total.
+    """
     service = OrderService(session)
-    orders, total = await service.get_user_orders(
-        current_user.id, skip=skip, limit=limit
-    )
 
-    return OrderListResponse(
-        total=total,
-        orders=[build_order_response(order) for order in orders],
+    # Returned directly so FastAPI skips response_model re-validation
+    if skip:
+        orders, has_next, total = await service.get_user_orders(
+            current_user.id, skip=skip, limit=limit, include_total=include_total
+        )
+        return ORJSONResponse(build_order_page(orders, has_next, total=total))
+
+    orders, next_cursor, total = await service.get_user_orders_keyset(
+        current_user.id,
+        before=before,
+        before_id=before_id,
+        limit=limit,
+        include_total=include_total
     )
+    return ORJSONResponse(build_order_page(orders, next_cursor is not None, next_cursor, total))
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -102,7 +173,7 @@ async def get_order(
     if order.buyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not your order")
 
-    return build_order_response(order)
+    return ORJSONResponse(build_order_response(order).model_dump())
 
 
 @router.post("/{order_id}/cancel", response_model=OrderResponse)
@@ -114,29 +185,43 @@ async def cancel_order(
     """Cancel an order before it is shipped."""
     service = OrderService(session)
     order = await service.cancel_order(order_id, current_user)
-    return build_order_response(order)
+    return ORJSONResponse(build_order_response(order).model_dump())
 
 
 #                     ADMIN ROUTES
 
 @router.get("/admin/all", response_model=OrderListResponse)
 async def get_all_orders(
-    skip: int = Query(0, ge=0),
+    before: Optional[datetime] = Query(None, description="Cursor: created_at of the last order seen"),
+    before_id: Optional[UUID] = Query(None, description="Cursor: id of the last order seen"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Offset pagination; use before/before_id"),
     limit: int = Query(20, ge=1, le=100),
     status: Optional[OrderStatus] = Query(None),
+    include_total: bool = Query(False, description="Also count all matching orders"),
     current_admin: User = Depends(get_current_admin),
     session: AsyncSession = Depends(get_session),
 ):
-    """Get all orders (admin only), optionally filter by status."""
+    """Get all orders (admin only), optionally filter by status.
+
+    Paginated like /my-orders.
+    """
     service = OrderService(session)
-    orders, total = await service.get_all_orders(
-        skip=skip, limit=limit, status=status
-    )
 
-    return OrderListResponse(
-        total=total,
-        orders=[build_order_response(order) for order in orders],
+    # Returned directly so FastAPI skips response_model re-validation
+    if skip:
+        orders, has_next, total = await service.get_all_orders(
+            skip=skip, limit=limit, status=status, include_total=include_total
+        )
+        return ORJSONResponse(build_order_page(orders, has_next, total=total))
+
+    orders, next_cursor, total = await service.get_all_orders_keyset(
+        before=before,
+        before_id=before_id,
+        limit=limit,
+        status=status,
+        include_total=include_total
     )
+    return ORJSONResponse(build_order_page(orders, next_cursor is not None, next_cursor, total))
 
 
 @router.patch("/{order_id}/status", response_model=OrderResponse)
@@ -149,4 +234,4 @@ async def update_order_status(
     """Update an order's status (admin only)."""
     service = OrderService(session)
     order = await service.update_status(order_id, status_update, current_admin)
-    return build_order_response(order)
+    return ORJSONResponse(build_order_response(order).model_dump())
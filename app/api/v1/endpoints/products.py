@@ -1,7 +1,8 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, Response, status, HTTPException
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schemas.product import (
@@ -11,6 +12,7 @@ from app.api.schemas.product import (
     ProductListResponse
 )
 
+from app.core.http_cache import etag_matches, make_etag, not_modified
 from app.core.security import get_current_seller
 from app.database.models import User
 from app.database.session import get_session
@@ -18,29 +20,82 @@ from app.services.product_service import ProductService
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
+PRODUCT_LIST_CACHE_CONTROL = "public, max-age=60"
+
+# Built once: validates ORM rows and dumps JSON entirely in pydantic-core
+_PRODUCT_LIST_ADAPTER = TypeAdapter(list[ProductResponse])
+
 
 # LIST ALL PRODUCTS (PUBLIC)
 @router.get("/", response_model=ProductListResponse)
 async def list_products(
-    skip: int = Query(0, ge=0),
+    request: Request,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Offset pagination; use cursor"),
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = Query(None),
     category_id: Optional[UUID] = Query(None),
+    include_total: bool = Query(False, description="Also count all matching products"),
     session: AsyncSession = Depends(get_session)
 ):
-    """List all active products (public endpoint)."""
+    """List all active products (public endpoint).
+
+    Keyset pagination: pass next_cursor from the previous page as cursor.
+    Supports conditional GET: the ETag changes whenever any product is added,
+    updated or removed, and is checked before the page is loaded.
+    """
 
     service = ProductService(session)
 
-    products, total = await service.get_all(
-        skip=skip,
-        limit=limit,
-        search=search,
-        category_id=category_id,
-        is_active=True
+    # Cheap version check first: plain page loads never count rows
+    last_updated = await service.get_list_version()
+    etag = make_etag(
+        last_updated, cursor, skip, limit, search, category_id, include_total
     )
+    if etag_matches(request, etag):
+        return not_modified(etag, PRODUCT_LIST_CACHE_CONTROL)
+
+    total = None
+    if include_total:
+        total = await service.count_all(
+            search=search,
+            category_id=category_id,
+            is_active=True
+        )
 
-    return ProductListResponse(total=total, products=products)
+    next_cursor = None
+    if skip:
+        products, has_next = await service.get_all(
+            skip=skip,
+            limit=limit,
+            search=search,
+            category_id=category_id,
+            is_active=True
+        )
+    else:
+        products, next_cursor = await service.get_all_keyset(
+            cursor=cursor,
+            limit=limit,
+            search=search,
+            category_id=category_id,
+            is_active=True
+        )
+        has_next = next_cursor is not None
+
+    products_json = _PRODUCT_LIST_ADAPTER.dump_json(
+        _PRODUCT_LIST_ADAPTER.validate_python(products, from_attributes=True)
+    )
+    # Returned directly so FastAPI skips jsonable_encoder + re-validation
+    return Response(
+        content=b'{"total":%s,"has_next":%s,"next_cursor":%s,"products":%s}' % (
+            b"%d" % total if total is not None else b"null",
+            b"true" if has_next else b"false",
+            b'"%s"' % next_cursor.encode("ascii") if next_cursor else b"null",
+            products_json
+        ),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": PRODUCT_LIST_CACHE_CONTROL}
+    )
 
 
 # GET SINGLE PRODUCT (PUBLIC)
@@ -68,6 +123,7 @@ async def get_product(
 async def get_my_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(False, description="Also count all the seller's products"),
     current_seller: User = Depends(get_current_seller),
     session: AsyncSession = Depends(get_session)
 ):
@@ -75,13 +131,14 @@ async def get_my_products(
 
     service = ProductService(session)
 
-    products, total = await service.get_seller_products(
+    products, has_next, total = await service.get_seller_products(
         seller_id=current_seller.id,
         skip=skip,
-        limit=limit
+        limit=limit,
+        include_total=include_total
     )
 
-    return ProductListResponse(total=total, products=products)
+    return ProductListResponse(total=total, has_next=has_next, products=products)
 
 
 # CREATE PRODUCT (SELLER ONLY)
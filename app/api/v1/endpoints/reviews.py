@@ -1,7 +1,8 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schemas.review import (
@@ -11,18 +12,38 @@ from app.api.schemas.review import (
     ReviewListResponse,
     ProductRatingSummary
 )
-from app.core.security import get_current_active_user
-from app.database.models import User
+from app.core.http_cache import etag_matches, make_etag, not_modified
+from app.core.responses import ORJSONResponse
+from app.core.security import CurrentUser
 from app.database.session import get_session
 from app.services.review_service import ReviewService
 
 router = APIRouter(prefix="/reviews", tags=["Reviews & Ratings"])
 
+REVIEW_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+
+def build_review_dict(review) -> dict:
+    """Convert Review model (with loaded user) → plain dict, no Pydantic pass."""
+    return {
+        "id": review.id,
+        "product_id": review.product_id,
+        "user_id": review.user_id,
+        "user": {"id": review.user.id, "full_name": review.user.full_name},
+        "rating": review.rating,
+        "title": review.title,
+        "comment": review.comment,
+        "is_verified_purchase": review.is_verified_purchase,
+        "created_at": review.created_at,
+        "updated_at": review.updated_at,
+    }
+
 
 # PUBLIC ENDPOINTS
 
-@router.get("/products/{product_id}", response_model=ReviewListResponse)
+@router.api_route("/products/{product_id}", methods=["GET", "HEAD"], response_model=ReviewListResponse)
 async def get_product_reviews(
+    request: Request,
     product_id: UUID,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
@@ -34,36 +55,42 @@ async def get_product_reviews(
     
     - Filter by rating (optional)
     - Returns rating distribution
+    - Supports conditional GET; the ETag changes when a review is added,
+      edited or removed
     """
     service = ReviewService(session)
     
-    reviews, total = await service.get_product_reviews(
+    last_updated, review_count = await service.get_review_version(product_id)
+    etag = make_etag(product_id, last_updated, review_count, skip, limit, rating)
+    if etag_matches(request, etag):
+        return not_modified(etag, REVIEW_CACHE_CONTROL)
+    
+    reviews, has_next = await service.get_product_reviews(
         product_id,
         skip=skip,
         limit=limit,
         rating_filter=rating
     )
     
-    # Get rating distribution
-    distribution = await service.get_rating_distribution(product_id)
-    
-    # Calculate average
-    total_ratings = sum(distribution.values())
-    if total_ratings > 0:
-        avg_rating = sum(rating * count for rating, count in distribution.items()) / total_ratings
-    else:
-        avg_rating = None
-    
-    return ReviewListResponse(
-        total=total,
-        average_rating=round(avg_rating, 2) if avg_rating else None,
-        rating_distribution=distribution,
-        reviews=reviews
-    )
+    # Average + distribution aggregated in SQL; the distribution also
+    # gives the filtered total without a separate COUNT
+    avg_rating, total, distribution = await service.get_rating_stats(product_id)
+    if rating:
+        total = distribution[rating]
+    
+    # Returned directly so FastAPI skips jsonable_encoder + re-validation
+    return ORJSONResponse({
+        "total": total,
+        "has_next": has_next,
+        "average_rating": avg_rating,
+        "rating_distribution": distribution,
+        "reviews": [build_review_dict(review) for review in reviews],
+    }, headers={"ETag": etag, "Cache-Control": REVIEW_CACHE_CONTROL})
 
 
-@router.get("/products/{product_id}/summary", response_model=ProductRatingSummary)
+@router.api_route("/products/{product_id}/summary", methods=["GET", "HEAD"], response_model=ProductRatingSummary)
 async def get_product_rating_summary(
+    request: Request,
     product_id: UUID,
     session: AsyncSession = Depends(get_session)
 ):
@@ -77,20 +104,19 @@ async def get_product_rating_summary(
     """
     service = ReviewService(session)
     
-    distribution = await service.get_rating_distribution(product_id)
+    last_updated, review_count = await service.get_review_version(product_id)
+    etag = make_etag(product_id, last_updated, review_count)
+    if etag_matches(request, etag):
+        return not_modified(etag, REVIEW_CACHE_CONTROL)
     
-    total_ratings = sum(distribution.values())
-    if total_ratings > 0:
-        avg_rating = sum(rating * count for rating, count in distribution.items()) / total_ratings
-    else:
-        avg_rating = None
+    avg_rating, total_ratings, distribution = await service.get_rating_stats(product_id)
     
-    return ProductRatingSummary(
-        product_id=product_id,
-        average_rating=round(avg_rating, 2) if avg_rating else None,
-        total_reviews=total_ratings,
-        rating_distribution=distribution
-    )
+    return ORJSONResponse({
+        "product_id": product_id,
+        "average_rating": avg_rating,
+        "total_reviews": total_ratings,
+        "rating_distribution": distribution,
+    }, headers={"ETag": etag, "Cache-Control": REVIEW_CACHE_CONTROL})
 
 
 # ============================================
@@ -100,7 +126,7 @@ async def get_product_rating_summary(
 @router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
 async def create_review(
     review_data: ReviewCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: CurrentUser,
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -115,28 +141,49 @@ async def create_review(
 
 @router.get("/my-reviews", response_model=list[ReviewResponse])
 async def get_my_reviews(
-    skip: int = Query(0, ge=0),
+    current_user: CurrentUser,
+    before: Optional[datetime] = Query(None, description="Cursor: created_at of the last review seen"),
+    before_id: Optional[UUID] = Query(None, description="Cursor: id of the last review seen"),
     limit: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_session)
 ):
-    """Get all reviews written by current user"""
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
+    """
+    Get all reviews written by current user
+    
+    Keyset pagination: pass the created_at/id of the last review
+    of the previous page as before/before_id
+    """
+    from sqlalchemy import select, tuple_
+    from sqlalchemy.orm import noload
+    from sqlalchemy.orm.attributes import set_committed_value
     from app.database.models import Review
     
     query = (
         select(Review)
-        .options(selectinload(Review.user))
+        .options(noload(Review.user))
         .where(Review.user_id == current_user.id)
-        .order_by(Review.created_at.desc())
-        .offset(skip)
+    )
+    
+    if before is not None and before_id is not None:
+        query = query.where(tuple_(Review.created_at, Review.id) < tuple_(before, before_id))
+    elif before is not None:
+        query = query.where(Review.created_at < before)
+    
+    query = (
+        query
+        .order_by(Review.created_at.desc(), Review.id.desc())
         .limit(limit)
     )
     
     result = await session.execute(query)
     reviews = result.scalars().all()
     
+    # Every review belongs to current_user: attach it instead of loading it.
+    # set_committed_value keeps the (possibly cached, detached) user out of
+    # the session's unit of work
+    for review in reviews:
+        set_committed_value(review, "user", current_user)
+    
     return reviews
 
 
@@ -163,7 +210,7 @@ async def get_review(
 async def update_review(
     review_id: UUID,
     review_update: ReviewUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: CurrentUser,
     session: AsyncSession = Depends(get_session)
 ):
     """Update your own review"""
@@ -174,7 +221,7 @@ async def update_review(
 @router.delete("/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_review(
     review_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user: CurrentUser,
     session: AsyncSession = Depends(get_session)
 ):
     """Delete your own review"""
@@ -1,4 +1,5 @@
-from typing import List
+from functools import cached_property
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,8 +15,9 @@ class Settings(BaseSettings):
     # Application
     APP_NAME: str = "ShopHub"
     APP_VERSION: str = "1.0.0"
-    DEBUG: bool = True
+    DEBUG: bool = False
     API_V1_PREFIX: str = "/api/v1"
+    SQL_LOG_LEVEL: str = "WARNING"  # INFO logs every statement
     
     # Database
     POSTGRES_SERVER: str
@@ -24,7 +26,16 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     
-    @property
+    # Connection pool
+    POOL_SIZE: int = 20
+    MAX_OVERFLOW: int = 20
+    POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    POOL_RECYCLE: int = 1800  # seconds
+    PGBOUNCER: bool = False  # transaction-pooling PgBouncer in front of Postgres
+    STATEMENT_CACHE_SIZE: int = 1024  # prepared statements kept per connection
+    SLOW_QUERY_MS: int = 100  # log statements slower than this; 0 disables
+    
+    @cached_property
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
@@ -32,14 +43,16 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
     
-    @property
+    @cached_property
     def REDIS_URL(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}"
     
     # Security
-    JWT_SECRET_KEY: str
+    JWT_SECRET_KEY: str  # HMAC secret, or the PEM private key for RS*/ES*/PS*
+    JWT_PUBLIC_KEY: Optional[str] = None  # PEM public key; required unless HS*
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    BCRYPT_ROUNDS: int = 12  # work factor for new password hashes
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
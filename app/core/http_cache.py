@@ -0,0 +1,36 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+# CONDITIONAL GET HELPERS
+
+def make_etag(*parts) -> str:
+    """Build a quoted strong ETag from the given version parts."""
+    raw = b":".join(
+        part if isinstance(part, bytes) else str(part).encode("utf-8")
+        for part in parts
+    )
+    return f'"{hashlib.blake2b(raw, digest_size=8).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    # Weak comparison, as required for If-None-Match
+    candidates = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Empty 304 response carrying the validator headers."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
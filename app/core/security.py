@@ -1,16 +1,22 @@
+import asyncio
+import base64
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Annotated, Optional
 from uuid import UUID
 
 import bcrypt
+import jwt
+import orjson
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from redis.exceptions import RedisError
+from sqlalchemy import lambda_stmt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from app.config import settings
-from app.database.models import User
+from app.database.models import User, UserRole
+from app.database.redis import redis_client
 from app.database.session import get_session
 
 
@@ -20,6 +26,25 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
+# JWT keys parsed once at import; PyJWT passes key objects through as-is
+# instead of re-parsing a PEM string on every encode/decode
+JWT_ALGORITHM = settings.JWT_ALGORITHM
+JWT_ALGORITHMS = [JWT_ALGORITHM]
+_JWT_ALGORITHM_IMPL = jwt.algorithms.get_default_algorithms()[JWT_ALGORITHM]
+JWT_SIGNING_KEY = _JWT_ALGORITHM_IMPL.prepare_key(settings.JWT_SECRET_KEY)
+
+if JWT_ALGORITHM.startswith("HS"):
+    JWT_VERIFYING_KEY = JWT_SIGNING_KEY
+elif settings.JWT_PUBLIC_KEY:
+    # Asymmetric tokens verify against the public key, never the private one
+    JWT_VERIFYING_KEY = _JWT_ALGORITHM_IMPL.prepare_key(settings.JWT_PUBLIC_KEY)
+else:
+    raise ValueError(f"JWT_PUBLIC_KEY is required for JWT_ALGORITHM={JWT_ALGORITHM}")
+
+# HMAC signing is cheap enough inline; RSA/EC signing is offloaded
+JWT_SIGN_IN_THREAD = not JWT_ALGORITHM.startswith("HS")
+
+
 # PASSWORD UTILITIES
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -33,36 +58,119 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """Hash password using bcrypt."""
     password_bytes = password.encode("utf-8")[:72]  # bcrypt max size
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode("utf-8")
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread so bcrypt doesn't block the loop."""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in a worker thread so bcrypt doesn't block the loop."""
+    return await asyncio.to_thread(get_password_hash, password)
+
+
 # JWT TOKEN CREATION
 
+def encode_subject(user_id: UUID) -> str:
+    """Encode a user id as the 22-char urlsafe base64 of its bytes."""
+    return base64.urlsafe_b64encode(user_id.bytes).rstrip(b"=").decode("ascii")
+
+
+def decode_subject(sub: str) -> Optional[UUID]:
+    """Decode a token subject; None if it isn't a valid user id."""
+    try:
+        if len(sub) == 22:
+            return UUID(bytes=base64.urlsafe_b64decode(sub + "=="))
+        # Hex form used by tokens issued before the compact encoding
+        return UUID(sub)
+    except ValueError:
+        return None
+
+
 def create_access_token(
     data: dict, expire_delta: Optional[timedelta] = None
 ) -> str:
-    """Create JWT access token."""
-    to_encode = data.copy()
-
-    expire = (
-        datetime.utcnow() + expire_delta
-        if expire_delta
-        else datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    """Create JWT access token; a UUID `sub` is stored in compact form."""
+    now = datetime.utcnow()
+    expire = now + (
+        expire_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
 
-    to_encode.update({
+    sub = data.get("sub")
+    if isinstance(sub, UUID):
+        data = {**data, "sub": encode_subject(sub)}
+
+    to_encode = {
+        **data,
         "exp": expire,
-        "iat": datetime.utcnow()  # issued at time
-    })
+        "iat": now  # issued at time
+    }
+
+    return jwt.encode(to_encode, JWT_SIGNING_KEY, algorithm=JWT_ALGORITHM)
+
+
+async def create_access_token_async(
+    data: dict, expire_delta: Optional[timedelta] = None
+) -> str:
+    """Create JWT access token without blocking the loop on asymmetric signing."""
+    if JWT_SIGN_IN_THREAD:
+        return await asyncio.to_thread(create_access_token, data, expire_delta)
+    return create_access_token(data, expire_delta)
+
+
+# AUTHENTICATED USER CACHE
+
+USER_CACHE_TTL = 60  # seconds
+_USER_CACHE_FIELDS = (
+    "email", "full_name", "phone", "role", "is_active", "is_verified",
+)
+
 
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM
+def _user_cache_key(user_id: UUID) -> str:
+    return f"auth:user:{user_id}"
+
+
+def _dump_cached_user(user: User) -> bytes:
+    """Serialize the fields endpoints read from current_user (never the hash)."""
+    data = {field: getattr(user, field) for field in _USER_CACHE_FIELDS}
+    data["created_at"] = user.created_at
+    data["updated_at"] = user.updated_at
+    return orjson.dumps(data)
+
+
+def _load_cached_user(user_id: UUID, raw: str) -> User:
+    """Rebuild a detached User snapshot from its cached form."""
+    data = orjson.loads(raw)
+    return User(
+        id=user_id,
+        hashed_password="",
+        role=UserRole(data.pop("role")),
+        created_at=datetime.fromisoformat(data.pop("created_at")),
+        updated_at=datetime.fromisoformat(data.pop("updated_at")),
+        **data
     )
-    return encoded_jwt
+
+
+async def invalidate_cached_user(user_id: UUID) -> None:
+    """Drop a user's cached snapshot after their row changes."""
+    try:
+        await redis_client.delete(_user_cache_key(user_id))
+    except RedisError:
+        pass  # entry expires on its own within USER_CACHE_TTL
+
+
+async def invalidate_cached_users(user_ids: list[UUID]) -> None:
+    """Drop the cached snapshots of many users, 1000 keys per DEL."""
+    keys = [_user_cache_key(user_id) for user_id in user_ids]
+    try:
+        for start in range(0, len(keys), 1000):
+            await redis_client.delete(*keys[start:start + 1000])
+    except RedisError:
+        pass
 
 
 # AUTH HELPERS
@@ -80,33 +188,39 @@ async def get_current_user(
 
     # Decode token
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
+        payload = jwt.decode(token, JWT_VERIFYING_KEY, algorithms=JWT_ALGORITHMS)
+    except jwt.PyJWTError:
+        raise credentials_exception
+
+    sub = payload.get("sub")
+    user_uuid = decode_subject(sub) if isinstance(sub, str) else None
+    if user_uuid is None:
+        raise credentials_exception
+
+    # Cached snapshot first; Redis being down only costs the DB lookup
+    cache_key = _user_cache_key(user_uuid)
+    try:
+        cached = await redis_client.get(cache_key)
+    except RedisError:
+        cached = None
+
+    if cached is not None:
+        user = _load_cached_user(user_uuid, cached)
+    else:
+        # Fetch user; runs on every cache miss, so the statement is cached
+        # as a lambda and only user_uuid is rebound
+        result = await session.execute(
+            lambda_stmt(lambda: select(User).where(User.id == user_uuid))
         )
-        user_id = payload.get("sub")
+        user = result.scalar_one_or_none()
 
-        if user_id is None:
+        if not user:
             raise credentials_exception
 
-        # Ensure user_id is valid UUID
         try:
-            user_uuid = UUID(user_id)
-        except ValueError:
-            raise credentials_exception
-
-    except JWTError:
-        raise credentials_exception
-
-    # Fetch user
-    result = await session.execute(
-        select(User).where(User.id == user_uuid)
-    )
-    user = result.scalar_one_or_none()
-
-    if not user:
-        raise credentials_exception
+            await redis_client.set(cache_key, _dump_cached_user(user), ex=USER_CACHE_TTL)
+        except RedisError:
+            pass
 
     if not user.is_active:
         raise HTTPException(
@@ -117,13 +231,8 @@ async def get_current_user(
     return user
 
 
-async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """Ensure user is active."""
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
+# Authenticated, active user; get_current_user already enforces is_active
+CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
 # ROLE-BASED ACCESS CONTROL
@@ -1,13 +1,23 @@
 from datetime import datetime
 from enum import Enum
 from typing import Optional
-from uuid import UUID, uuid4
+from uuid import UUID
 
 from sqlmodel import Field, Relationship, SQLModel, Column, UniqueConstraint
-from sqlalchemy import ARRAY, String, Index, Text
+from sqlalchemy import ARRAY, Computed, Float, String, Index, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID as PGUUID, TIMESTAMP
 
 
+def utc_now():
+    """Transaction timestamp in UTC, computed by Postgres instead of Python."""
+    return func.timezone("utc", func.now())
+
+
+# Fetch server-computed timestamps via RETURNING so onupdate values are
+# loaded on flush instead of being expired (no lazy load under asyncio)
+EAGER_DEFAULTS = {"eager_defaults": True}
+
+
 class UserRole(str, Enum):
     BUYER = "buyer"
     SELLER = "seller"
@@ -16,10 +26,11 @@ class UserRole(str, Enum):
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __mapper_args__ = EAGER_DEFAULTS
 
-    id: UUID = Field(
-        default_factory=uuid4,
-        sa_column=Column(PGUUID(as_uuid=True), primary_key=True)
+    id: Optional[UUID] = Field(
+        default=None,
+        sa_column=Column(PGUUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     )
     email: str = Field(unique=True, index=True, max_length=255)
     full_name: str = Field(max_length=255)
@@ -30,13 +41,13 @@ class User(SQLModel, table=True):
     is_verified: bool = Field(default=False)
     role: UserRole = Field(default=UserRole.BUYER)
 
-    created_at: datetime = Field(
-        default_factory=datetime.utcnow,
-        sa_column=Column(TIMESTAMP, nullable=False)
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now())
     )
-    updated_at: datetime = Field(
-        default_factory=datetime.utcnow,
-        sa_column=Column(TIMESTAMP, nullable=False)
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now(), onupdate=utc_now())
     )
 
     products: list["Product"] = Relationship(back_populates="seller")
@@ -48,24 +59,43 @@ class User(SQLModel, table=True):
 class Category(SQLModel, table=True):
     __tablename__ = "categories"
 
-    id: UUID = Field(
-        default_factory=uuid4,
-        sa_column=Column(PGUUID(as_uuid=True), primary_key=True)
+    id: Optional[UUID] = Field(
+        default=None,
+        sa_column=Column(PGUUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     )
     name: str = Field(unique=True, max_length=100, index=True)
     description: Optional[str] = Field(default=None)
 
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now())
+    )
 
     products: list["Product"] = Relationship(back_populates="category")
 
 
 class Product(SQLModel, table=True):
     __tablename__ = "products"
+    __mapper_args__ = EAGER_DEFAULTS
+
+    __table_args__ = (
+        # pg_trgm GIN indexes: ILIKE '%term%' search uses these instead of a seq scan
+        Index('idx_product_name_trgm', 'name', postgresql_using='gin',
+              postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('idx_product_description_trgm', 'description', postgresql_using='gin',
+              postgresql_ops={'description': 'gin_trgm_ops'}),
+        # Catalog keyset pages: (created_at, id) seeks, with and without a category
+        Index('idx_product_active_category_created_id', 'is_active', 'category_id',
+              text('created_at DESC'), text('id DESC')),
+        Index('idx_product_active_created_id', 'is_active',
+              text('created_at DESC'), text('id DESC')),
+        # Product list ETag version: max(updated_at)
+        Index('idx_product_updated_at', 'updated_at'),
+    )
 
-    id: UUID = Field(
-        default_factory=uuid4,
-        sa_column=Column(PGUUID(as_uuid=True), primary_key=True)
+    id: Optional[UUID] = Field(
+        default=None,
+        sa_column=Column(PGUUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     )
 
     name: str = Field(max_length=225, index=True)
@@ -75,13 +105,17 @@ class Product(SQLModel, table=True):
     image_urls: list[str] = Field(default=[], sa_column=Column(ARRAY(String)))
     is_active: bool = Field(default=True)
 
-    created_at: datetime = Field(
-        default_factory=datetime.utcnow,
-        sa_column=Column(TIMESTAMP, nullable=False)
+    # Maintained incrementally by ReviewService on every review write
+    average_rating: Optional[float] = Field(default=None)
+    total_reviews: int = Field(default=0)
+
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now())
     )
-    updated_at: datetime = Field(
-        default_factory=datetime.utcnow,
-        sa_column=Column(TIMESTAMP, nullable=False)
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now(), onupdate=utc_now())
     )
 
     seller_id: UUID = Field(foreign_key="users.id")
@@ -96,20 +130,27 @@ class Product(SQLModel, table=True):
 
 class CartItem(SQLModel, table=True):
     __tablename__ = "cart_items"
+    __mapper_args__ = EAGER_DEFAULTS
     
     __table_args__ = (
         UniqueConstraint('user_id', 'product_id', name='unique_user_product_cart'),
         Index('idx_cart_user_id', 'user_id'),  # Performance index
     )
 
-    id: UUID = Field(
-        default_factory=uuid4,
-        sa_column=Column(PGUUID(as_uuid=True), primary_key=True)
+    id: Optional[UUID] = Field(
+        default=None,
+        sa_column=Column(PGUUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     )
     quantity: int = Field(ge=1)
 
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now())
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now(), onupdate=utc_now())
+    )
 
     user_id: UUID = Field(foreign_key="users.id")
     product_id: UUID = Field(foreign_key="products.id")
@@ -130,16 +171,19 @@ class OrderStatus(str, Enum):
 
 class Order(SQLModel, table=True):
     __tablename__ = "orders"
+    __mapper_args__ = EAGER_DEFAULTS
     
     __table_args__ = (
-        Index('idx_order_buyer_id', 'buyer_id'),
+        # Buyer order history: keyset pages on (created_at, id) per buyer
+        Index('idx_order_buyer_created_id', 'buyer_id', text('created_at DESC'), text('id DESC')),
         Index('idx_order_status', 'status'),
-        Index('idx_order_created_at', 'created_at'),
+        # Admin order list: keyset pages on (created_at, id)
+        Index('idx_order_created_id', text('created_at DESC'), text('id DESC')),
     )
 
-    id: UUID = Field(
-        default_factory=uuid4,
-        sa_column=Column(PGUUID(as_uuid=True), primary_key=True)
+    id: Optional[UUID] = Field(
+        default=None,
+        sa_column=Column(PGUUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     )
 
     order_number: str = Field(unique=True, index=True)
@@ -151,13 +195,13 @@ class Order(SQLModel, table=True):
     shipping_zip: str
     shipping_phone: str
 
-    created_at: datetime = Field(
-        default_factory=datetime.utcnow,
-        sa_column=Column(TIMESTAMP, nullable=False)
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now())
     )
-    updated_at: datetime = Field(
-        default_factory=datetime.utcnow,
-        sa_column=Column(TIMESTAMP, nullable=False)
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now(), onupdate=utc_now())
     )
 
     buyer_id: UUID = Field(foreign_key="users.id")
@@ -168,13 +212,22 @@ class Order(SQLModel, table=True):
 
 class OrderItem(SQLModel, table=True):
     __tablename__ = "order_items"
+    
+    __table_args__ = (
+        Index('idx_order_item_order_id', 'order_id'),  # selectinload(Order.items)
+    )
 
-    id: UUID = Field(
-        default_factory=uuid4,
-        sa_column=Column(PGUUID(as_uuid=True), primary_key=True)
+    id: Optional[UUID] = Field(
+        default=None,
+        sa_column=Column(PGUUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     )
     quantity: int = Field(ge=1)
     price_at_purchase: float = Field(ge=0)
+    # Generated by Postgres so responses don't recompute it per item
+    subtotal: Optional[float] = Field(
+        default=None,
+        sa_column=Column(Float, Computed("price_at_purchase * quantity", persisted=True))
+    )
 
     order_id: UUID = Field(foreign_key="orders.id")
     product_id: UUID = Field(foreign_key="products.id")
@@ -185,18 +238,22 @@ class OrderItem(SQLModel, table=True):
 
 class Review(SQLModel, table=True):
     __tablename__= "reviews"
+    __mapper_args__ = EAGER_DEFAULTS
     
     __table_args__ = (
         # One review per user per product
         UniqueConstraint('user_id', 'product_id', name='unique_user_product_review'),
-        Index('idx_review_product_id','product_id'),
-        Index('idx_review_user_id', 'user_id'),
+        # Product rating stats: covers product_id lookups and lets the
+        # per-rating aggregates run as index-only scans
+        Index('idx_review_product_rating', 'product_id', 'rating'),
+        # My-reviews keyset pagination: (created_at, id) < cursor per user
+        Index('idx_review_user_created_id', 'user_id', text('created_at DESC'), text('id DESC')),
         Index('idx_review_rating', 'rating'),
     )
     
-    id: UUID = Field(
-        default_factory=uuid4,
-        sa_column=Column(PGUUID(as_uuid=True), primary_key=True)
+    id: Optional[UUID] = Field(
+        default=None,
+        sa_column=Column(PGUUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     )
     
     rating: int = Field(ge=1, le=5, description="Rating from 1 to 5 stars")
@@ -206,9 +263,13 @@ class Review(SQLModel, table=True):
     # Verified purchase flag
     is_verified_purchase: bool = Field(default=False)
     
-    created_at: datetime = Field(
-        default_factory=datetime.utcnow,
-        sa_column=Column(TIMESTAMP,nullable=False)
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now())
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(TIMESTAMP, nullable=False, server_default=utc_now(), onupdate=utc_now())
     )
     
     user_id: UUID = Field(foreign_key="users.id")
@@ -4,7 +4,8 @@ from app.config import settings
 redis_client = Redis.from_url(
     settings.REDIS_URL,
     encoding="utf-8",
-    decode_response=True
+    decode_responses=True,
+    health_check_interval=30
 )
 
 
@@ -1,30 +1,83 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import logging
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel
 
 from app.config import settings
 
+if settings.PGBOUNCER:
+    # PgBouncer owns pooling; asyncpg's prepared statements don't survive
+    # transaction pooling, so disable both statement caches
+    pool_kwargs = {
+        "poolclass": NullPool,
+        "connect_args": {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+        },
+    }
+else:
+    pool_kwargs = {
+        "pool_size": settings.POOL_SIZE,
+        "max_overflow": settings.MAX_OVERFLOW,
+        "pool_timeout": settings.POOL_TIMEOUT,
+        "pool_recycle": settings.POOL_RECYCLE,
+        "pool_pre_ping": True,
+        # Reuse server-side prepared statements (parse/plan once per connection);
+        # every query uses bound parameters, so the SQL text stays stable
+        "connect_args": {
+            "statement_cache_size": settings.STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.STATEMENT_CACHE_SIZE,
+        },
+    }
+
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
+    echo=False,
+    echo_pool=False,
+    future=True,
+    **pool_kwargs
 )
 
+logger = logging.getLogger(__name__)
+
+
+# SLOW QUERY LOG
 
-async_session_maker = sessionmaker(
+if settings.SLOW_QUERY_MS:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"]) * 1000
+        if elapsed_ms >= settings.SLOW_QUERY_MS:
+            logger.warning("Slow query (%.1f ms): %s", elapsed_ms, statement)
+
+
+async_session_maker = async_sessionmaker(
     engine,
-    class_=AsyncSession,
     expire_on_commit=False,
-    autocommit=False,
     autoflush=False
 )
 
 
 async def create_db_tables():
     async with engine.begin() as conn:
+        # Trigram operator classes for the product search indexes
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(SQLModel.metadata.create_all)
         
 
 async def get_session() -> AsyncSession:
+    """One session and one transaction per request.
+
+    Services flush instead of committing; the transaction commits when the
+    request finishes and rolls back if it raises.
+    """
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        async with session.begin():
+            yield session
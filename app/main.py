@@ -1,9 +1,11 @@
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from scalar_fastapi import get_scalar_api_reference
 
+from app.core.responses import ORJSONResponse
 from app.config import settings
 from app.database.session import create_db_tables
 from app.api.v1.router import api_router
@@ -12,6 +14,8 @@ from app.api.v1.router import api_router
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan events"""
+    # SQL statement logging is opt-in via SQL_LOG_LEVEL
+    logging.getLogger("sqlalchemy.engine").setLevel(settings.SQL_LOG_LEVEL)
     # Startup: Create database tables
     await create_db_tables()
     print("✅ Database tables created")
@@ -27,6 +31,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
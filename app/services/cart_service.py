@@ -2,10 +2,13 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import delete, literal, select, func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.database.models import CartItem, Product, User
+from app.database.models import CartItem, Product, User, utc_now
 from app.api.schemas.cart import CartItemCreate, CartItemUpdate
 
 
@@ -18,10 +21,27 @@ class CartService:
     # GET USER CART
     async def get_user_cart(self, user_id: UUID) -> list[CartItem]:
         result = await self.session.execute(
-            select(CartItem).where(CartItem.user_id == user_id)
+            select(CartItem)
+            .options(selectinload(CartItem.product))
+            .where(CartItem.user_id == user_id)
         )
         return list(result.scalars().all())
 
+    # GET CART TOTALS (aggregated in SQL)
+    async def get_cart_totals(self, user_id: UUID) -> tuple[int, int, float]:
+        """Return (line items, total quantity, total price) for a user's cart."""
+        result = await self.session.execute(
+            select(
+                func.count(CartItem.id),
+                func.coalesce(func.sum(CartItem.quantity), 0),
+                func.coalesce(func.sum(CartItem.quantity * Product.price), 0.0)
+            )
+            .join(Product, Product.id == CartItem.product_id)
+            .where(CartItem.user_id == user_id)
+        )
+        total_items, total_quantity, total_price = result.one()
+        return total_items, int(total_quantity), float(total_price)
+
     # GET ONE CART ITEM
     async def get_cart_item(
         self,
@@ -43,49 +63,83 @@ class CartService:
         user: User
     ) -> CartItem:
 
-        # Ensure product exists
-        product = await self.session.get(Product, cart_data.product_id)
+        quantity = cart_data.quantity
 
-        if not product or not product.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Product is not available"
+        # Lock the product row only if it can satisfy the requested quantity
+        product_cte = (
+            select(Product)
+            .where(
+                Product.id == cart_data.product_id,
+                Product.is_active.is_(True),
+                Product.stock >= quantity
             )
+            .with_for_update()
+            .cte("p")
+        )
 
-        # Stock check
-        if product.stock < cart_data.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Only {product.stock} items available in stock"
+        # Insert or bump quantity; the conflict branch only applies while the
+        # merged quantity still fits the locked stock
+        upsert = insert(CartItem).from_select(
+            ["user_id", "product_id", "quantity"],
+            select(
+                literal(user.id, CartItem.__table__.c.user_id.type),
+                product_cte.c.id,
+                literal(quantity)
             )
+        )
+        upsert_cte = (
+            upsert.on_conflict_do_update(
+                constraint="unique_user_product_cart",
+                set_={
+                    "quantity": CartItem.quantity + upsert.excluded.quantity,
+                    "updated_at": utc_now()
+                },
+                where=(
+                    CartItem.quantity + upsert.excluded.quantity
+                    <= select(product_cte.c.stock).scalar_subquery()
+                )
+            )
+            .returning(*CartItem.__table__.c)
+            .cte("ins")
+        )
 
-        # Check if already exists
-        existing_item = await self.get_cart_item(user.id, cart_data.product_id)
+        # One round-trip: upsert the item and get it back with its product
+        cart_alias = aliased(CartItem, upsert_cte)
+        # Map Product through an alias of p ("p AS pp"); an entity over p itself
+        # makes the ORM compile it as a second, unrelated CTE named "p"
+        product_alias = aliased(Product, product_cte.alias("pp"))
+        result = await self.session.execute(
+            select(cart_alias, product_alias)
+            .join(product_alias, product_alias.id == cart_alias.product_id)
+            .execution_options(populate_existing=True)
+        )
+        row = result.one_or_none()
 
-        if existing_item:
-            new_quantity = existing_item.quantity + cart_data.quantity
+        if row is None:
+            # Failure path only: look the product up to explain why
+            product = await self.session.get(Product, cart_data.product_id)
 
-            if new_quantity > product.stock:
+            if not product or not product.is_active:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Cannot add more. Only {product.stock} items available"
+                    detail="Product is not available"
                 )
 
-            existing_item.quantity = new_quantity
-            await self.session.commit()
-            await self.session.refresh(existing_item)
-            return existing_item
+            if product.stock < quantity:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Only {product.stock} items available in stock"
+                )
 
-        # Create fresh cart item
-        cart_item = CartItem(
-            user_id=user.id,
-            product_id=cart_data.product_id,
-            quantity=cart_data.quantity
-        )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot add more. Only {product.stock} items available"
+            )
+
+        cart_item, product = row
 
-        self.session.add(cart_item)
-        await self.session.commit()
-        await self.session.refresh(cart_item)
+        # Attach the product from the same row so the endpoint needs no extra query
+        set_committed_value(cart_item, "product", product)
         return cart_item
 
     # UPDATE CART ITEM QUANTITY
@@ -121,8 +175,10 @@ class CartService:
             )
 
         cart_item.quantity = update_data.quantity
-        await self.session.commit()
-        await self.session.refresh(cart_item)
+        await self.session.flush()
+
+        # Product was just loaded; attach it instead of refreshing
+        set_committed_value(cart_item, "product", product)
         return cart_item
 
     # REMOVE CART ITEM
@@ -147,15 +203,12 @@ class CartService:
             )
 
         await self.session.delete(cart_item)
-        await self.session.commit()
+        await self.session.flush()
         return True
 
     # CLEAR CART
     async def clear_cart(self, user: User) -> bool:
-        cart_items = await self.get_user_cart(user.id)
-
-        for item in cart_items:
-            await self.session.delete(item)
-
-        await self.session.commit()
+        await self.session.execute(
+            delete(CartItem).where(CartItem.user_id == user.id)
+        )
         return True
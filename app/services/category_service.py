@@ -2,10 +2,12 @@ from typing import Optional, List
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, func
+from sqlalchemy import delete, exists, select, func, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.database.models import Category
+from app.database.models import Category, Product, utc_now
 from app.api.schemas.product import CategoryCreate
 
 
@@ -16,11 +18,8 @@ class CategoryService:
         self.session = session
 
     async def get_by_id(self, category_id: UUID) -> Optional[Category]:
-        """Get category by ID."""
-        result = await self.session.execute(
-            select(Category).where(Category.id == category_id)
-        )
-        return result.scalar_one_or_none()
+        """Get category by ID (identity map first: no SELECT if the session has it)."""
+        return await self.session.get(Category, category_id)
 
     async def get_by_name(self, name: str) -> Optional[Category]:
         """Get category by name."""
@@ -32,38 +31,43 @@ class CategoryService:
     async def get_all(
         self,
         skip: int = 0,
-        limit: int = 50
-    ) -> tuple[List[Category], int]:
-        """Get categories with pagination."""
-
-        # Count total
-        total = await self.session.scalar(select(func.count(Category.id)))
-
-        # Get paginated results
+        limit: int = 50,
+        include_total: bool = False
+    ) -> tuple[List[Category], bool, Optional[int]]:
+        """Get categories with pagination.
+
+        Returns (categories, has_next, total); total is only counted on request.
+        """
+        total = None
+        if include_total:
+            total = await self.session.scalar(select(func.count()).select_from(Category))
+
+        # Fetch one extra row to learn whether another page exists
         result = await self.session.execute(
-            select(Category).offset(skip).limit(limit)
+            select(Category).offset(skip).limit(limit + 1)
         )
-        categories = result.scalars().all()
+        categories = list(result.scalars().all())
 
-        return categories, total
+        return categories[:limit], len(categories) > limit, total
 
     async def create(self, category_data: CategoryCreate) -> Category:
         """Create a new category."""
 
-        # Check name exists
-        existing = await self.get_by_name(category_data.name)
-        if existing:
+        # Insert unless the name is taken; the unique index does the check
+        result = await self.session.execute(
+            insert(Category)
+            .values(**category_data.model_dump())
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(Category)
+        )
+        category = result.scalar_one_or_none()
+
+        if category is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Category with this name already exists"
             )
 
-        category = Category(**category_data.model_dump())
-
-        self.session.add(category)
-        await self.session.commit()
-        await self.session.refresh(category)
-
         return category
 
     async def update(
@@ -73,28 +77,49 @@ class CategoryService:
     ) -> Category:
         """Update category."""
 
-        category = await self.get_by_id(category_id)
-        if not category:
+        # Load the category and check the new name against the others in one trip
+        other = aliased(Category)
+        name_taken = exists().where(
+            other.name == category_data.name,
+            other.id != category_id
+        )
+        result = await self.session.execute(
+            select(Category, name_taken).where(Category.id == category_id)
+        )
+        row = result.one_or_none()
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Category not found"
             )
 
+        category, name_conflict = row
+
         # Name conflict
-        if category_data.name != category.name:
-            existing = await self.get_by_name(category_data.name)
-            if existing:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Category with this name already exists"
-                )
+        if name_conflict:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Category with this name already exists"
+            )
 
         # Apply updates
+        changed = False
         for field, value in category_data.model_dump().items():
-            setattr(category, field, value)
-
-        await self.session.commit()
-        await self.session.refresh(category)
+            if getattr(category, field) != value:
+                setattr(category, field, value)
+                changed = True
+
+        await self.session.flush()
+
+        # Product responses embed the category, so move their updated_at too;
+        # otherwise the product list ETag keeps serving the old name
+        if changed:
+            await self.session.execute(
+                update(Product)
+                .where(Product.category_id == category_id)
+                .values(updated_at=utc_now())
+                .execution_options(synchronize_session=False)
+            )
 
         return category
 
@@ -108,16 +133,23 @@ class CategoryService:
                 detail="Category not found"
             )
 
-        # Ensure products relationship is loaded
-        await self.session.refresh(category, ["products"])
+        # Count attached products instead of loading them
+        product_count = await self.session.scalar(
+            select(func.count()).select_from(Product).where(Product.category_id == category_id)
+        )
 
-        if category.products:
+        if product_count:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Cannot delete category. It has {len(category.products)} products."
+                detail=f"Cannot delete category. It has {product_count} products."
             )
 
-        await self.session.delete(category)
-        await self.session.commit()
+        # Plain DELETE: session.delete() would load category.products to
+        # null out their foreign keys, and we just saw there are none
+        await self.session.execute(
+            delete(Category)
+            .where(Category.id == category_id)
+            .execution_options(synchronize_session=False)
+        )
 
         return True
@@ -1,16 +1,35 @@
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
-import secrets
-from sqlalchemy.orm import selectinload
+import base64
+import os
+import time
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, func
+from sqlalchemy import Integer, column, delete, lambda_stmt, select, func, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.models import Order, OrderItem, OrderStatus, Product, User, CartItem
 from app.api.schemas.order import CheckoutRequest, OrderStatusUpdate
 
+# Loaders for every order query that is serialized: items + their products
+# arrive in two extra IN-queries instead of lazy-loading per item, and any
+# other relationship access raises instead of quietly adding queries
+ORDER_LOADERS = (
+    selectinload(Order.items).selectinload(OrderItem.product),
+    raiseload("*"),
+)
+
+# List pages only render each item's product name, so skip the rest of the
+# product row (description text, image urls)
+ORDER_LIST_LOADERS = (
+    selectinload(Order.items).selectinload(OrderItem.product).load_only(Product.id, Product.name),
+    raiseload("*"),
+)
+
 
 class OrderService:
     """Service for order operations"""
@@ -19,94 +38,172 @@ class OrderService:
         self.session = session
 
     def _generate_order_number(self) -> str:
-        """Generate unique order number"""
-        timestamp = datetime.utcnow().strftime("%Y%m%d")
-        random_part = secrets.token_hex(4).upper()
+        """Generate unique order number: UTC date + 8 base32 chars (40 random bits)"""
+        timestamp = time.strftime("%Y%m%d", time.gmtime())
+        random_part = base64.b32encode(os.urandom(5)).decode("ascii")
         return f"ORD-{timestamp}-{random_part}"
 
     async def get_by_id(self, order_id: UUID) -> Optional[Order]:
         """Get order by ID"""
         result = await self.session.execute(
-            select(Order)
-            .options(
-                selectinload(Order.items).selectinload(OrderItem.product)
+            lambda_stmt(
+                lambda: select(Order)
+                .options(*ORDER_LOADERS)
+                .where(Order.id == order_id)
             )
-            .where(Order.id == order_id)
         )
         return result.scalar_one_or_none()
 
+    async def _get_orders_page(
+        self,
+        filters: list,
+        before: Optional[datetime],
+        before_id: Optional[UUID],
+        limit: int,
+        include_total: bool = False
+    ) -> tuple[list[Order], Optional[tuple[datetime, UUID]], Optional[int]]:
+        """Fetch one keyset page of the orders matching `filters`, newest first"""
+        # Count straight off the filters; no subquery around the page query
+        total = None
+        if include_total:
+            total = await self.session.scalar(
+                select(func.count(Order.id)).where(*filters)
+            )
+
+        query = select(Order).where(*filters)
+
+        if before is not None and before_id is not None:
+            query = query.where(tuple_(Order.created_at, Order.id) < tuple_(before, before_id))
+        elif before is not None:
+            query = query.where(Order.created_at < before)
+
+        # Fetch one extra row to learn whether another page exists
+        result = await self.session.execute(
+            query
+            .options(*ORDER_LIST_LOADERS)
+            .order_by(Order.created_at.desc(), Order.id.desc())
+            .limit(limit + 1)
+        )
+        orders = list(result.scalars().all())
+
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = (orders[-1].created_at, orders[-1].id)
+
+        return orders, next_cursor, total
+
+    async def get_user_orders_keyset(
+        self,
+        user_id: UUID,
+        before: Optional[datetime] = None,
+        before_id: Optional[UUID] = None,
+        limit: int = 20,
+        include_total: bool = False
+    ) -> tuple[list[Order], Optional[tuple[datetime, UUID]], Optional[int]]:
+        """
+        Get a page of a user's orders older than the (before, before_id) cursor
+
+        Returns the orders, the cursor for the next page (None on the last page)
+        and the total, which is only counted on request
+        """
+        filters = [Order.buyer_id == user_id]
+        return await self._get_orders_page(filters, before, before_id, limit, include_total)
+
+    async def get_all_orders_keyset(
+        self,
+        before: Optional[datetime] = None,
+        before_id: Optional[UUID] = None,
+        limit: int = 20,
+        status: Optional[OrderStatus] = None,
+        include_total: bool = False
+    ) -> tuple[list[Order], Optional[tuple[datetime, UUID]], Optional[int]]:
+        """Get a page of all orders (admin only), keyset-paginated like get_user_orders_keyset"""
+        filters = []
+        if status:
+            filters.append(Order.status == status)
+
+        return await self._get_orders_page(filters, before, before_id, limit, include_total)
+
     async def get_user_orders(
         self,
         user_id: UUID,
         skip: int = 0,
-        limit: int = 20
-    ) -> tuple[list[Order], int]:
-        """Get all orders for a user"""
-        # Count total
-        count_query = select(func.count(Order.id)).where(Order.buyer_id == user_id)
-        total = await self.session.scalar(count_query)
-
-        # Get orders
+        limit: int = 20,
+        include_total: bool = False
+    ) -> tuple[list[Order], bool, Optional[int]]:
+        """
+        Get all orders for a user (deprecated: offset pagination, use get_user_orders_keyset)
+
+        Returns (orders, has_next, total); total is only counted on request
+        """
+        total = None
+        if include_total:
+            count_query = select(func.count(Order.id)).where(Order.buyer_id == user_id)
+            total = await self.session.scalar(count_query)
+
+        # Get orders, plus one extra row to learn whether another page exists
         query = (
             select(Order)
-            .options(
-                selectinload(Order.items).selectinload(OrderItem.product)
-            )
+            .options(*ORDER_LIST_LOADERS)
             .where(Order.buyer_id == user_id)
             .order_by(Order.created_at.desc())
             .offset(skip)
-            .limit(limit)
+            .limit(limit + 1)
         )
         result = await self.session.execute(query)
-        orders = result.scalars().all()
+        orders = list(result.scalars().all())
 
-        return list(orders), total
+        return orders[:limit], len(orders) > limit, total
 
     async def get_all_orders(
         self,
         skip: int = 0,
         limit: int = 20,
-        status: Optional[OrderStatus] = None
-    ) -> tuple[list[Order], int]:
-        """Get all orders (admin only)"""
-        query = select(Order)
+        status: Optional[OrderStatus] = None,
+        include_total: bool = False
+    ) -> tuple[list[Order], bool, Optional[int]]:
+        """
+        Get all orders (admin only; deprecated: offset pagination, use get_all_orders_keyset)
 
+        Returns (orders, has_next, total); total is only counted on request
+        """
+        filters = []
         if status:
-            query = query.where(Order.status == status)
+            filters.append(Order.status == status)
 
-        # Count before pagination
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.session.scalar(count_query)
+        # Count straight off the filters; no subquery around the page query
+        total = None
+        if include_total:
+            count_query = select(func.count(Order.id)).where(*filters)
+            total = await self.session.scalar(count_query)
 
-        # Apply loading + ordering + pagination to the same query
+        # Get orders, plus one extra row to learn whether another page exists
         query = (
-            query
-            .options(
-                selectinload(Order.items).selectinload(OrderItem.product)
-            )
+            select(Order)
+            .options(*ORDER_LIST_LOADERS)
+            .where(*filters)
             .order_by(Order.created_at.desc())
             .offset(skip)
-            .limit(limit)
+            .limit(limit + 1)
         )
 
         result = await self.session.execute(query)
-        orders = result.scalars().all()
+        orders = list(result.scalars().all())
 
-        return list(orders), total
+        return orders[:limit], len(orders) > limit, total
 
     async def checkout(self, checkout_data: CheckoutRequest, user: User) -> Order:
         """Create order from cart items"""
-        # Load user + cart items + product
+        # Load cart items + their products (one IN-query for all products)
         result = await self.session.execute(
-            select(User)
-            .options(
-                selectinload(User.cart_items).selectinload(CartItem.product)
-            )
-            .where(User.id == user.id)
+            select(CartItem)
+            .options(selectinload(CartItem.product))
+            .where(CartItem.user_id == user.id)
         )
-        user = result.scalar_one()
+        cart_items = list(result.scalars().all())
         
-        if not user.cart_items:
+        if not cart_items:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cart is empty"
@@ -115,7 +212,7 @@ class OrderService:
         total_amount = 0
         order_items_data = []
         
-        for cart_item in user.cart_items:
+        for cart_item in cart_items:
             product = cart_item.product
             
             if not product.is_active:
@@ -153,31 +250,52 @@ class OrderService:
         self.session.add(order)
         await self.session.flush()
         
-        # Create items + reduce stock
-        for item_data in order_items_data:
-            product = await self.session.get(Product, item_data["product_id"])
-            
-            self.session.add(OrderItem(
-                order_id=order.id,
-                **item_data
-            ))
-            
-            product.stock -= item_data["quantity"]
-            product.updated_at = datetime.utcnow()
-        
-        # Clear cart
-        for cart_item in user.cart_items:
-            await self.session.delete(cart_item)
-        
-        await self.session.commit()
+        # Create items
+        order_items = [
+            OrderItem(order_id=order.id, **item_data)
+            for item_data in order_items_data
+        ]
+        self.session.add_all(order_items)
         
-        # Return full order
+        # Reduce stock for all products in one UPDATE ... FROM (VALUES ...);
+        # the stock guard catches checkouts that raced past the checks above
+        quantities = values(
+            column("product_id", PGUUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="quantities"
+        ).data([
+            (item_data["product_id"], item_data["quantity"])
+            for item_data in order_items_data
+        ])
+        products = Product.__table__
         result = await self.session.execute(
-            select(Order)
-            .options(selectinload(Order.items).selectinload(OrderItem.product))
-            .where(Order.id == order.id)
+            update(products)
+            .where(
+                products.c.id == quantities.c.product_id,
+                products.c.stock >= quantities.c.quantity
+            )
+            .values(stock=products.c.stock - quantities.c.quantity)
+            .returning(products.c.id)
+        )
+        if len(result.all()) != len(order_items_data):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Stock changed during checkout, please review your cart"
+            )
+        
+        # Clear cart in one statement (cart_items stays usable in memory)
+        await self.session.execute(
+            delete(CartItem).where(CartItem.user_id == user.id)
         )
-        return result.scalar_one()
+        
+        await self.session.flush()
+        
+        # Ids and subtotals came back via RETURNING; attach the relationships
+        # from memory instead of reloading the whole order
+        for order_item, cart_item in zip(order_items, cart_items):
+            set_committed_value(order_item, "product", cart_item.product)
+        set_committed_value(order, "items", order_items)
+        return order
 
     async def update_status(
         self,
@@ -196,17 +314,10 @@ class OrderService:
 
         # Update status
         order.status = status_update.status
-        order.updated_at = datetime.utcnow()
 
-        await self.session.commit()
-        result = await self.session.execute(
-            select(Order)
-            .options(
-                selectinload(Order.items).selectinload(OrderItem.product)
-            )
-            .where(Order.id == order.id)
-        )
-        order = result.scalar_one()
+        await self.session.flush()
+
+        # Items were loaded by get_by_id and haven't changed
         return order
 
     async def cancel_order(
@@ -241,17 +352,23 @@ class OrderService:
                 detail=f"Cannot cancel order with status: {order.status}"
             )
 
-        # Restore stock
-        for item in order.items:
-            product = item.product
-            product.stock += item.quantity
-            product.updated_at = datetime.utcnow()
+        # Restore stock for all items in one UPDATE ... FROM (VALUES ...)
+        quantities = values(
+            column("product_id", PGUUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="quantities"
+        ).data([(item.product_id, item.quantity) for item in order.items])
+        products = Product.__table__
+        await self.session.execute(
+            update(products)
+            .where(products.c.id == quantities.c.product_id)
+            .values(stock=products.c.stock + quantities.c.quantity)
+        )
 
         # Cancel order
         order.status = OrderStatus.CANCELLED
-        order.updated_at = datetime.utcnow()
 
-        await self.session.commit()
-        await self.session.refresh(order)
+        await self.session.flush()
 
+        # No refresh: it would expire order.items and force a lazy load
         return order
\ No newline at end of file
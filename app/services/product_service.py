@@ -1,14 +1,46 @@
+import base64
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
 
+import orjson
 from fastapi import HTTPException, status
-from sqlalchemy import select, or_, func
+from sqlalchemy import lambda_stmt, select, or_, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.models import Product, Category, User
 from app.api.schemas.product import ProductCreate, ProductUpdate
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+# List pages keep the main SELECT single-table; category and seller come in
+# one small IN query each instead of widening every row with joins. Sellers
+# only need the SellerInfo columns.
+PRODUCT_LIST_LOADERS = (
+    selectinload(Product.category),
+    selectinload(Product.seller).load_only(User.id, User.full_name, User.email),
+    raiseload("*"),
+)
+
+
+def encode_cursor(created_at: datetime, product_id: UUID) -> str:
+    """Opaque keyset cursor: urlsafe base64 of {"ts", "id"}."""
+    payload = orjson.dumps({"ts": created_at, "id": str(product_id)})
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor from encode_cursor; 400 if it was tampered with."""
+    try:
+        data = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(data["ts"]), UUID(data["id"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
 
 class ProductService:
     """Service for product operations"""
@@ -17,24 +49,23 @@ class ProductService:
         self.session = session
 
     async def get_by_id(self, product_id: UUID) -> Optional[Product]:
-        q = (
-            select(Product)
-            .options(joinedload(Product.category), joinedload(Product.seller))
+        # Product detail hot path: built and cached once, product_id is rebound
+        q = lambda_stmt(
+            lambda: select(Product)
+            .options(joinedload(Product.category), joinedload(Product.seller), raiseload("*"))
             .where(Product.id == product_id)
         )
         result = await self.session.execute(q)
         return result.scalar_one_or_none()
 
-    async def get_all(
+    def _apply_filters(
         self,
-        skip: int = 0,
-        limit: int = 20,
+        query,
         search: Optional[str] = None,
         category_id: Optional[UUID] = None,
         is_active: Optional[bool] = True
-    ) -> tuple[list[Product], int]:
-        query = select(Product).options(joinedload(Product.category), joinedload(Product.seller))
-
+    ):
+        """Apply the public listing filters to a Product query."""
         if is_active is not None:
             query = query.where(Product.is_active == is_active)
 
@@ -48,47 +79,136 @@ class ProductService:
             )
             query = query.where(search_filter)
 
-        query = query.order_by(Product.created_at.desc())
+        return query
+
+    async def get_list_version(self) -> Optional[datetime]:
+        """Return the latest products.updated_at, used as the listing ETag version.
+
+        Unfiltered on purpose: products are only ever soft-deleted, so any
+        insert, edit or deactivation moves this max, and it is a single
+        lookup on idx_product_updated_at instead of a scan of the matches.
+        """
+        return await self.session.scalar(select(func.max(Product.updated_at)))
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.session.execute(count_query)
-        total = total_result.scalar()
+    async def count_all(
+        self,
+        search: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        is_active: Optional[bool] = True
+    ) -> int:
+        """Count the products matching the listing filters."""
+        query = self._apply_filters(
+            select(func.count()).select_from(Product),
+            search=search,
+            category_id=category_id,
+            is_active=is_active
+        )
+        return await self.session.scalar(query)
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        search: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        is_active: Optional[bool] = True
+    ) -> tuple[list[Product], bool]:
+        """Return (products, has_next); counts come from count_all.
+
+        Deprecated offset pagination, use get_all_keyset.
+        """
+        query = select(Product).options(*PRODUCT_LIST_LOADERS)
+        query = self._apply_filters(
+            query,
+            search=search,
+            category_id=category_id,
+            is_active=is_active
+        )
 
-        query = query.offset(skip).limit(limit)
+        # Fetch one extra row to learn whether another page exists
+        query = query.order_by(Product.created_at.desc()).offset(skip).limit(limit + 1)
 
         result = await self.session.execute(query)
-        products = result.scalars().all()
+        products = list(result.scalars().all())
 
-        return list(products), total
+        return products[:limit], len(products) > limit
 
+    async def get_all_keyset(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        search: Optional[str] = None,
+        category_id: Optional[UUID] = None,
+        is_active: Optional[bool] = True
+    ) -> tuple[list[Product], Optional[str]]:
+        """Return (products, next cursor) for the page after `cursor`, newest first.
+
+        The next cursor is None on the last page.
+        """
+        query = select(Product).options(*PRODUCT_LIST_LOADERS)
+        query = self._apply_filters(
+            query,
+            search=search,
+            category_id=category_id,
+            is_active=is_active
+        )
+
+        if cursor:
+            created_at, product_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(Product.created_at, Product.id) < tuple_(created_at, product_id)
+            )
+
+        # Fetch one extra row to learn whether another page exists
+        query = (
+            query
+            .order_by(Product.created_at.desc(), Product.id.desc())
+            .limit(limit + 1)
+        )
+
+        result = await self.session.execute(query)
+        products = list(result.scalars().all())
+
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            next_cursor = encode_cursor(products[-1].created_at, products[-1].id)
+
+        return products, next_cursor
 
     async def get_seller_products(
         self,
         seller_id: UUID,
         skip: int = 0,
-        limit: int = 20
-    ) -> tuple[list[Product], int]:
+        limit: int = 20,
+        include_total: bool = False
+    ) -> tuple[list[Product], bool, Optional[int]]:
+        """Return (products, has_next, total); total is only counted on request."""
+        total = None
+        if include_total:
+            total = await self.session.scalar(
+                select(func.count()).select_from(Product).where(Product.seller_id == seller_id)
+            )
+
+        # Fetch one extra row to learn whether another page exists
         query = (
             select(Product)
-            .options(joinedload(Product.category), joinedload(Product.seller))
+            .options(*PRODUCT_LIST_LOADERS)
             .where(Product.seller_id == seller_id)
             .order_by(Product.created_at.desc())
+            .offset(skip)
+            .limit(limit + 1)
         )
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.session.execute(count_query)
-        total = total_result.scalar()
-
-        query = query.offset(skip).limit(limit)
-
         result = await self.session.execute(query)
-        products = result.scalars().all()
+        products = list(result.scalars().all())
 
-        return list(products), total
+        return products[:limit], len(products) > limit, total
 
     
 
     async def create(self, product_data: ProductCreate, seller: User) -> Product:
+        category = None
         if product_data.category_id:
             category = await self.session.get(Category, product_data.category_id)
             if not category:
@@ -103,9 +223,10 @@ class ProductService:
         )
 
         self.session.add(product)
-        await self.session.commit()
-        # refresh to load relationships so serialization won't trigger lazy-load
-        await self.session.refresh(product, ["category", "seller"])
+        await self.session.flush()
+        # Attach the rows already in hand so serialization won't trigger lazy-load
+        set_committed_value(product, "category", category)
+        set_committed_value(product, "seller", seller)
         return product
 
 
@@ -133,6 +254,7 @@ class ProductService:
             )
 
         # Validate category if being updated
+        category = None
         if product_update.category_id:
             category = await self.session.get(Category, product_update.category_id)
             if not category:
@@ -152,11 +274,13 @@ class ProductService:
         for field, value in update_data.items():
             setattr(product, field, value)
 
-        product.updated_at = datetime.utcnow()
-
         self.session.add(product)
-        await self.session.commit()
-        await self.session.refresh(product)
+        await self.session.flush()
+
+        # Every new value is known locally; only a changed category needs
+        # swapping in, from the row validated above
+        if "category_id" in update_data:
+            set_committed_value(product, "category", category)
 
         return product
 
@@ -178,9 +302,8 @@ class ProductService:
 
         # Soft delete
         product.is_active = False
-        product.updated_at = datetime.utcnow()
 
         self.session.add(product)
-        await self.session.commit()
+        await self.session.flush()
 
         return True
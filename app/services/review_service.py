@@ -3,9 +3,11 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, func
+from sqlalchemy import case, exists, lambda_stmt, literal, select, func, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.database.models import Review, Product, User, Order, OrderItem, OrderStatus
 from app.api.schemas.review import ReviewCreate, ReviewUpdate
@@ -17,18 +19,12 @@ class ReviewService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def check_verified_purchase(
-        self,
-        user_id: UUID,
-        product_id: UUID
-    ) -> bool:
-        """
-        Check if user has purchased this product
-        """
-        query = (
-            select(Order)
-            .join(OrderItem)
+    def _verified_purchase_clause(self, user_id: UUID, product_id: UUID):
+        """EXISTS clause: user has a paid (or later) order containing the product"""
+        return (
+            exists()
             .where(
+                OrderItem.order_id == Order.id,
                 Order.buyer_id == user_id,
                 OrderItem.product_id == product_id,
                 Order.status.in_([
@@ -39,29 +35,14 @@ class ReviewService:
                 ])
             )
         )
-        result = await self.session.execute(query)
-        order = result.scalar_one_or_none()
-        return order is not None
 
     async def get_by_id(self, review_id: UUID) -> Optional[Review]:
         """Get review by ID"""
         result = await self.session.execute(
-            select(Review)
-            .options(selectinload(Review.user))
-            .where(Review.id == review_id)
-        )
-        return result.scalar_one_or_none()
-
-    async def get_user_review_for_product(
-        self,
-        user_id: UUID,
-        product_id: UUID
-    ) -> Optional[Review]:
-        """Check if user already reviewed this product"""
-        result = await self.session.execute(
-            select(Review).where(
-                Review.user_id == user_id,
-                Review.product_id == product_id
+            lambda_stmt(
+                lambda: select(Review)
+                .options(selectinload(Review.user), raiseload("*"))
+                .where(Review.id == review_id)
             )
         )
         return result.scalar_one_or_none()
@@ -72,47 +53,71 @@ class ReviewService:
         skip: int = 0,
         limit: int = 20,
         rating_filter: Optional[int] = None
-    ) -> tuple[list[Review], int]:
-        """Get all reviews for a product"""
+    ) -> tuple[list[Review], bool]:
+        """
+        Get a page of reviews for a product as (reviews, has_next)
+
+        Totals come from get_rating_stats, which counts per rating anyway
+        """
         query = (
             select(Review)
-            .options(selectinload(Review.user))
+            .options(selectinload(Review.user).load_only(User.id, User.full_name), raiseload("*"))
             .where(Review.product_id == product_id)
         )
 
         if rating_filter:
             query = query.where(Review.rating == rating_filter)
 
-        # Count total
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.session.scalar(count_query)
-
-        # Get paginated results
+        # Fetch one extra row to learn whether another page exists
         query = (
             query
             .order_by(Review.created_at.desc())
             .offset(skip)
-            .limit(limit)
+            .limit(limit + 1)
         )
 
         result = await self.session.execute(query)
-        reviews = result.scalars().all()
+        reviews = list(result.scalars().all())
+
+        return reviews[:limit], len(reviews) > limit
 
-        return list(reviews), total
+    async def get_rating_stats(
+        self,
+        product_id: UUID
+    ) -> tuple[Optional[float], int, dict[int, int]]:
+        """
+        Get (average rating, total reviews, distribution 1-5) in one query
+        """
+        result = await self.session.execute(
+            select(
+                func.avg(Review.rating),
+                func.count(),
+                *(func.count().filter(Review.rating == rating) for rating in range(1, 6))
+            ).where(Review.product_id == product_id)
+        )
+        avg_rating, total, *counts = result.one()
 
-    async def get_rating_distribution(self, product_id: UUID) -> dict[int, int]:
-        """Get count of reviews for each rating (1-5)"""
+        distribution = dict(zip(range(1, 6), counts))
+        average = round(float(avg_rating), 2) if avg_rating is not None else None
+
+        return average, total, distribution
+
+    async def get_review_version(
+        self,
+        product_id: UUID
+    ) -> tuple[Optional[datetime], int]:
+        """
+        Return (product updated_at, review count), used as the reviews' ETag version
+
+        A primary-key lookup: every review write bumps the product row through
+        _apply_rating_change, so its updated_at moves with the reviews
+        """
         result = await self.session.execute(
-            select(Review.rating, func.count(Review.id))
-            .where(Review.product_id == product_id)
-            .group_by(Review.rating)
+            select(Product.updated_at, Product.total_reviews)
+            .where(Product.id == product_id)
         )
-        
-        distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for rating, count in result.all():
-            distribution[rating] = count
-        
-        return distribution
+        row = result.one_or_none()
+        return tuple(row) if row is not None else (None, 0)
 
     async def create(
         self,
@@ -120,44 +125,52 @@ class ReviewService:
         user: User
     ) -> Review:
         """Create a new review"""
-        # Check if product exists
-        product = await self.session.get(Product, review_data.product_id)
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Product not found"
-            )
+        product_id = review_data.product_id
+        columns = Review.__table__.c
 
-        # Check if user already reviewed this product
-        existing_review = await self.get_user_review_for_product(
-            user.id,
-            review_data.product_id
+        # Insert from the product row itself, so a missing product inserts
+        # nothing, and compute the verified flag in the same statement
+        stmt = insert(Review).from_select(
+            ["rating", "title", "comment", "user_id", "product_id", "is_verified_purchase"],
+            select(
+                literal(review_data.rating, columns.rating.type),
+                literal(review_data.title, columns.title.type),
+                literal(review_data.comment, columns.comment.type),
+                literal(user.id, columns.user_id.type),
+                Product.id,
+                self._verified_purchase_clause(user.id, product_id)
+            )
+            .where(Product.id == product_id)
         )
-        if existing_review:
+        # The unique constraint does the already-reviewed check
+        result = await self.session.execute(
+            stmt
+            .on_conflict_do_nothing(constraint="unique_user_product_review")
+            .returning(Review)
+        )
+        review = result.scalar_one_or_none()
+
+        if review is None:
+            # Failure path only: tell a missing product from a duplicate
+            product_exists = await self.session.scalar(
+                select(exists().where(Product.id == product_id))
+            )
+            if not product_exists:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Product not found"
+                )
+
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="You have already reviewed this product. Use update instead."
             )
 
-        # Check if verified purchase
-        is_verified = await self.check_verified_purchase(
-            user.id,
-            review_data.product_id
-        )
-
-        # Create review
-        review = Review(
-            **review_data.model_dump(),
-            user_id=user.id,
-            is_verified_purchase=is_verified
-        )
-
-        self.session.add(review)
-        await self.session.commit()
-        await self.session.refresh(review, ["user"])
+        # The author is the current user; no need to load it back
+        set_committed_value(review, "user", user)
 
         # Update product rating
-        await self.update_product_rating(review_data.product_id)
+        await self._apply_rating_change(review.product_id, 1, review.rating)
 
         return review
 
@@ -183,18 +196,17 @@ class ReviewService:
                 detail="You can only update your own reviews"
             )
 
+        old_rating = review.rating
+
         # Update fields
         update_data = review_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(review, field, value)
 
-        review.updated_at = datetime.utcnow()
-
-        await self.session.commit()
-        await self.session.refresh(review)
+        await self.session.flush()
 
         # Update product rating
-        await self.update_product_rating(review.product_id)
+        await self._apply_rating_change(review.product_id, 0, review.rating - old_rating)
 
         return review
 
@@ -216,31 +228,75 @@ class ReviewService:
             )
 
         product_id = review.product_id
+        rating = review.rating
 
         await self.session.delete(review)
-        await self.session.commit()
+        await self.session.flush()
 
         # Update product rating
-        await self.update_product_rating(product_id)
+        await self._apply_rating_change(product_id, -1, -rating)
 
         return True
 
-    async def update_product_rating(self, product_id: UUID) -> None:
-        """Recalculate and update product's average rating"""
-        # Get average rating
-        result = await self.session.execute(
+    async def _apply_rating_change(
+        self,
+        product_id: UUID,
+        count_delta: int,
+        rating_delta: int
+    ) -> None:
+        """
+        Adjust a product's stored rating by one review's change
+
+        One UPDATE in the review's transaction instead of re-aggregating
+        every review of the product; SET expressions see the old row.
+        Runs even for a zero change so updated_at (the reviews' ETag
+        version) moves on every review write
+        """
+        new_total = Product.total_reviews + count_delta
+        await self.session.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(
+                average_rating=case(
+                    (new_total == 0, None),
+                    else_=(
+                        func.coalesce(Product.average_rating, 0) * Product.total_reviews
+                        + rating_delta
+                    ) / new_total
+                ),
+                total_reviews=new_total
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def update_product_rating(
+        self,
+        product_id: UUID
+    ) -> Optional[tuple[Optional[float], int]]:
+        """
+        Recalculate a product's rating from all of its reviews
+
+        Exact recount for correcting drift in the incrementally kept values;
+        runs in the caller's transaction as one UPDATE ... FROM the aggregate.
+        Returns the new (average rating, total reviews), None if no such product.
+        """
+        stats = (
             select(
-                func.avg(Review.rating),
-                func.count(Review.id)
-            ).where(Review.product_id == product_id)
+                func.avg(Review.rating).label("average_rating"),
+                func.count().label("total_reviews")
+            )
+            .where(Review.product_id == product_id)
+            .subquery("stats")
+        )
+        result = await self.session.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(
+                average_rating=stats.c.average_rating,
+                total_reviews=stats.c.total_reviews
+            )
+            .returning(Product.average_rating, Product.total_reviews)
+            .execution_options(synchronize_session=False)
         )
-        avg_rating, total_reviews = result.one()
-
-        # Update product
-        product = await self.session.get(Product, product_id)
-        if product:
-            product.average_rating = round(avg_rating, 2) if avg_rating else None
-            product.total_reviews = total_reviews or 0
-            product.updated_at = datetime.utcnow()
-            
-            await self.session.commit()
\ No newline at end of file
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
@@ -1,13 +1,14 @@
 from typing import Optional
 from uuid import UUID
-from datetime import datetime
 
 from fastapi import HTTPException, status
+from sqlalchemy import lambda_stmt, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from app.core.security import get_password_hash, verify_password
-from app.database.models import User
+from app.core.security import get_password_hash_async, verify_password_async
+from app.database.models import Product, User, utc_now
 from app.api.schemas.user import UserCreate, UserUpdate
 
 
@@ -17,41 +18,45 @@ class UserService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    #Get user by email
+    #Get user by email (login hot path: lambda_stmt caches the statement,
+    # only the email is rebound per call)
     async def get_by_email(self, email: str) -> Optional[User]:
         result = await self.session.execute(
-            select(User).where(User.email == email)
+            lambda_stmt(lambda: select(User).where(User.email == email))
         )
         return result.scalar_one_or_none()
 
-    # Get user by ID
+    # Get user by ID (identity map first: no SELECT if the session has it)
     async def get_by_id(self, user_id: UUID) -> Optional[User]:
-        result = await self.session.execute(
-            select(User).where(User.id == user_id)
-        )
-        return result.scalar_one_or_none()
+        return await self.session.get(User, user_id)
 
     # Create new user
     async def create_user(self, user_data: UserCreate) -> User:
-        existing_user = await self.get_by_email(user_data.email)
-        if existing_user:
+        hashed_password = await get_password_hash_async(user_data.password)
+
+        # Insert unless the email is taken; the unique index does the check
+        result = await self.session.execute(
+            insert(User)
+            .values(
+                email=user_data.email,
+                full_name=user_data.full_name,
+                phone=user_data.phone,
+                role=user_data.role,
+                hashed_password=hashed_password,
+                is_active=True,
+                is_verified=False,
+            )
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User)
+        )
+        user = result.scalar_one_or_none()
+
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
 
-        user = User(
-            email=user_data.email,
-            full_name=user_data.full_name,
-            phone=user_data.phone,
-            role=user_data.role,
-            hashed_password=get_password_hash(user_data.password),
-        )
-
-        self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
-
         return user
 
     # Authentication
@@ -63,7 +68,7 @@ class UserService:
         if not user.is_active:  # prevent deleted users from logging in
             return None
         
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         
         return user
@@ -78,17 +83,26 @@ class UserService:
             )
 
         update_data = user_update.model_dump(exclude_unset=True)
+        name_changed = (
+            "full_name" in update_data and update_data["full_name"] != user.full_name
+        )
 
         # Apply updates
         for field, value in update_data.items():
             setattr(user, field, value)
 
-        # update timestamp
-        user.updated_at = datetime.utcnow()
-
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+
+        # Product responses embed the seller's name, so move their updated_at
+        # too; otherwise the product list ETag keeps serving the old one
+        if name_changed:
+            await self.session.execute(
+                update(Product)
+                .where(Product.seller_id == user_id)
+                .values(updated_at=utc_now())
+                .execution_options(synchronize_session=False)
+            )
 
         return user
 
@@ -102,7 +116,6 @@ class UserService:
             )
 
         user.is_active = False
-        user.updated_at = datetime.utcnow()
 
         self.session.add(user)
-        await self.session.commit()
+        await self.session.flush()
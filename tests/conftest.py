@@ -0,0 +1,98 @@
+import os
+from contextlib import contextmanager
+
+import pytest
+from asyncpg import PostgresError
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+
+from app.config import settings
+
+
+def _database_url():
+    """
+    TEST_DATABASE_URL, or the configured database with a _test suffix
+
+    The fixtures never run against the application's own database.
+    """
+    url = os.environ.get("TEST_DATABASE_URL")
+    if url:
+        return make_url(url)
+
+    app_url = make_url(settings.DATABASE_URL)
+    return app_url.set(database=f"{app_url.database}_test")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def connection():
+    """
+    Connection to the test database inside a transaction that is rolled
+    back after the test
+
+    Tables are created in the same transaction, so nothing is left behind.
+    Skips when the database can't be reached or lacks pg_trgm.
+    """
+    engine = create_async_engine(_database_url(), poolclass=NullPool)
+    try:
+        conn = await engine.connect()
+    except (OSError, DBAPIError, PostgresError) as exc:
+        await engine.dispose()
+        pytest.skip(f"Postgres not reachable: {exc}")
+
+    transaction = await conn.begin()
+    try:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError as exc:
+        await transaction.rollback()
+        await conn.close()
+        await engine.dispose()
+        pytest.skip(f"pg_trgm extension not available: {exc}")
+
+    await conn.run_sync(SQLModel.metadata.create_all)
+
+    yield conn
+
+    await transaction.rollback()
+    await conn.close()
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(connection):
+    """Session joined to the test transaction; services only flush"""
+    async with AsyncSession(
+        bind=connection,
+        expire_on_commit=False,
+        autoflush=False,
+        join_transaction_mode="create_savepoint"
+    ) as session:
+        yield session
+
+
+@pytest.fixture
+def count_queries(connection):
+    """Context manager collecting every statement sent to the database"""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        sync_conn = connection.sync_connection
+        event.listen(sync_conn, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(sync_conn, "before_cursor_execute", before_cursor_execute)
+
+    return counter
@@ -0,0 +1,102 @@
+"""
+CartService.add_to_cart against Postgres
+
+The add is a single WITH statement (lock product, upsert item, read both
+back), so these cover the statement itself as well as each 400 branch.
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.api.schemas.cart import CartItemCreate
+from app.database.models import Product, User, UserRole
+from app.services.cart_service import CartService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def shop(session):
+    """A buyer, one product with 5 in stock and one inactive product"""
+    seller = User(
+        email="seller@example.com", full_name="Seller",
+        hashed_password="x", role=UserRole.SELLER
+    )
+    buyer = User(email="buyer@example.com", full_name="Buyer", hashed_password="x")
+    session.add_all([seller, buyer])
+    await session.flush()
+
+    product = Product(
+        name="Lamp", description="Desk lamp", price=25.0, stock=5, seller_id=seller.id
+    )
+    retired = Product(
+        name="Old lamp", description="Discontinued", price=20.0, stock=5,
+        is_active=False, seller_id=seller.id
+    )
+    session.add_all([product, retired])
+    await session.flush()
+
+    session.expunge_all()
+    return {"buyer": buyer, "product_id": product.id, "retired_id": retired.id}
+
+
+async def test_add_inserts_item_with_product(session, shop, count_queries):
+    with count_queries() as statements:
+        item = await CartService(session).add_to_cart(
+            CartItemCreate(product_id=shop["product_id"], quantity=2), shop["buyer"]
+        )
+
+    assert len(statements) == 1, statements
+    assert item.id is not None
+    assert item.quantity == 2
+    assert item.user_id == shop["buyer"].id
+    assert item.product.id == shop["product_id"]
+    assert item.product.stock == 5
+
+
+async def test_add_merges_quantity(session, shop):
+    service = CartService(session)
+    first = await service.add_to_cart(
+        CartItemCreate(product_id=shop["product_id"], quantity=2), shop["buyer"]
+    )
+    second = await service.add_to_cart(
+        CartItemCreate(product_id=shop["product_id"], quantity=3), shop["buyer"]
+    )
+
+    assert second.id == first.id
+    assert second.quantity == 5
+    assert len(await service.get_user_cart(shop["buyer"].id)) == 1
+
+
+async def test_add_over_stock_is_rejected(session, shop):
+    service = CartService(session)
+
+    with pytest.raises(HTTPException) as exc:
+        await service.add_to_cart(
+            CartItemCreate(product_id=shop["product_id"], quantity=6), shop["buyer"]
+        )
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "Only 5 items available in stock"
+
+    # Fits on its own, but not merged with what is already in the cart
+    await service.add_to_cart(
+        CartItemCreate(product_id=shop["product_id"], quantity=4), shop["buyer"]
+    )
+    with pytest.raises(HTTPException) as exc:
+        await service.add_to_cart(
+            CartItemCreate(product_id=shop["product_id"], quantity=2), shop["buyer"]
+        )
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "Cannot add more. Only 5 items available"
+
+    items = await service.get_user_cart(shop["buyer"].id)
+    assert [item.quantity for item in items] == [4]
+
+
+async def test_add_inactive_product_is_rejected(session, shop):
+    with pytest.raises(HTTPException) as exc:
+        await CartService(session).add_to_cart(
+            CartItemCreate(product_id=shop["retired_id"], quantity=1), shop["buyer"]
+        )
+
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "Product is not available"
@@ -0,0 +1,106 @@
+"""
+Product list ETag freshness
+
+The list version is max(products.updated_at) over every product, so a
+soft delete must move it, and since the body embeds each product's
+category and seller, changing either must move it too.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from app.api.schemas.product import CategoryCreate
+from app.api.schemas.user import UserUpdate
+from app.database.models import Category, Product, User, UserRole
+from app.services.category_service import CategoryService
+from app.services.product_service import ProductService
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+STALE = datetime(2000, 1, 1)
+
+
+@pytest.fixture
+async def listed(session):
+    """One product with a category and seller, last touched long ago"""
+    category = Category(name="Lamps")
+    seller = User(
+        email="seller@example.com", full_name="Seller",
+        hashed_password="x", role=UserRole.SELLER
+    )
+    session.add_all([category, seller])
+    await session.flush()
+
+    product = Product(
+        name="Lamp", description="Desk lamp", price=25.0, stock=5,
+        seller_id=seller.id, category_id=category.id
+    )
+    session.add(product)
+    await session.flush()
+
+    # Every statement here shares one transaction timestamp, so backdate
+    # the row to see the bump
+    await session.execute(
+        update(Product).where(Product.id == product.id).values(updated_at=STALE)
+    )
+    return {
+        "category_id": category.id, "seller": seller,
+        "seller_id": seller.id, "product_id": product.id
+    }
+
+
+async def _updated_at(session, product_id):
+    return await session.scalar(
+        select(Product.updated_at).where(Product.id == product_id)
+    )
+
+
+async def test_category_rename_bumps_products(session, listed):
+    await CategoryService(session).update(
+        listed["category_id"], CategoryCreate(name="Lighting")
+    )
+
+    assert await _updated_at(session, listed["product_id"]) > STALE
+
+
+async def test_unchanged_category_leaves_products(session, listed):
+    await CategoryService(session).update(
+        listed["category_id"], CategoryCreate(name="Lamps")
+    )
+
+    assert await _updated_at(session, listed["product_id"]) == STALE
+
+
+async def test_seller_rename_bumps_products(session, listed):
+    await UserService(session).update_user(
+        listed["seller_id"], UserUpdate(full_name="New Seller")
+    )
+
+    assert await _updated_at(session, listed["product_id"]) > STALE
+
+
+async def test_seller_phone_change_leaves_products(session, listed):
+    await UserService(session).update_user(
+        listed["seller_id"], UserUpdate(phone="555-0100")
+    )
+
+    assert await _updated_at(session, listed["product_id"]) == STALE
+
+
+async def test_version_is_one_cheap_statement(session, listed, count_queries):
+    service = ProductService(session)
+    with count_queries() as statements:
+        version = await service.get_list_version()
+
+    assert len(statements) == 1, statements
+    assert "count" not in statements[0].lower()
+    assert version == STALE
+
+
+async def test_deactivation_moves_version(session, listed):
+    service = ProductService(session)
+    await service.delete(listed["product_id"], listed["seller"])
+
+    assert await service.get_list_version() > STALE
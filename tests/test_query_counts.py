@@ -0,0 +1,134 @@
+"""
+Statement budgets for the paginated list paths
+
+A 20-item page must cost a fixed number of statements (the page plus one
+selectin query per eager-loaded relationship), no matter how many rows it
+holds. raiseload("*") turns any lazy load during serialization into an
+error, so rendering the response body inside the counter checks both
+guarantees.
+"""
+import pytest
+from pydantic import TypeAdapter
+
+from app.api.schemas.product import ProductResponse
+from app.api.v1.endpoints.orders import build_order_page
+from app.api.v1.endpoints.reviews import build_review_dict
+from app.core.responses import ORJSONResponse
+from app.database.models import (
+    Category, Order, OrderItem, OrderStatus, Product, Review, User, UserRole,
+)
+from app.services.order_service import OrderService
+from app.services.product_service import ProductService
+from app.services.review_service import ReviewService
+
+pytestmark = pytest.mark.anyio
+
+PAGE_SIZE = 20
+MAX_PAGE_QUERIES = 3
+
+
+@pytest.fixture
+async def catalog(session):
+    """One page plus one row of products, reviews and orders"""
+    rows = PAGE_SIZE + 1
+
+    category = Category(name="Books")
+    seller = User(
+        email="seller@example.com", full_name="Seller",
+        hashed_password="x", role=UserRole.SELLER
+    )
+    buyer = User(email="buyer@example.com", full_name="Buyer", hashed_password="x")
+    reviewers = [
+        User(email=f"reviewer{i}@example.com", full_name=f"Reviewer {i}", hashed_password="x")
+        for i in range(rows)
+    ]
+    session.add_all([category, seller, buyer, *reviewers])
+    await session.flush()
+
+    products = [
+        Product(
+            name=f"Product {i}", description="A long description " * 20,
+            price=10.0 + i, stock=100, seller_id=seller.id, category_id=category.id
+        )
+        for i in range(rows)
+    ]
+    session.add_all(products)
+    await session.flush()
+
+    reviewed = products[0]
+    session.add_all([
+        Review(rating=i % 5 + 1, title=f"Review {i}", user_id=reviewer.id, product_id=reviewed.id)
+        for i, reviewer in enumerate(reviewers)
+    ])
+
+    orders = [
+        Order(
+            order_number=f"ORD-TEST-{i:04d}", status=OrderStatus.PAID, total_amount=30.0,
+            shipping_address="1 Main Street", shipping_city="Town",
+            shipping_zip="12345", shipping_phone="5550000000", buyer_id=buyer.id
+        )
+        for i in range(rows)
+    ]
+    session.add_all(orders)
+    await session.flush()
+
+    session.add_all([
+        OrderItem(order_id=order.id, product_id=product.id, quantity=1, price_at_purchase=product.price)
+        for order in orders
+        for product in products[:2]
+    ])
+    await session.flush()
+
+    # Measured calls must load everything themselves, not hit the identity map
+    session.expunge_all()
+    return {"buyer_id": buyer.id, "product_id": reviewed.id, "category_id": category.id}
+
+
+async def test_product_reviews_page(session, catalog, count_queries):
+    with count_queries() as statements:
+        reviews, has_next = await ReviewService(session).get_product_reviews(
+            catalog["product_id"], limit=PAGE_SIZE
+        )
+        body = [build_review_dict(review) for review in reviews]
+        ORJSONResponse(body)
+
+    assert len(body) == PAGE_SIZE
+    assert has_next
+    assert len(statements) <= MAX_PAGE_QUERIES, statements
+
+
+async def test_order_list_page(session, catalog, count_queries):
+    with count_queries() as statements:
+        orders, next_cursor, _ = await OrderService(session).get_user_orders_keyset(
+            catalog["buyer_id"], limit=PAGE_SIZE
+        )
+        body = build_order_page(orders, next_cursor is not None, next_cursor)
+        ORJSONResponse(body)
+
+    assert len(body["orders"]) == PAGE_SIZE
+    assert all(len(order["items"]) == 2 for order in body["orders"])
+    assert body["has_next"]
+    assert len(statements) <= MAX_PAGE_QUERIES, statements
+
+
+async def test_product_list_page(session, catalog, count_queries):
+    adapter = TypeAdapter(list[ProductResponse])
+
+    with count_queries() as statements:
+        products, next_cursor = await ProductService(session).get_all_keyset(
+            limit=PAGE_SIZE, category_id=catalog["category_id"]
+        )
+        body = adapter.validate_python(products, from_attributes=True)
+        adapter.dump_json(body)
+
+    assert len(body) == PAGE_SIZE
+    assert next_cursor is not None
+    assert len(statements) <= MAX_PAGE_QUERIES, statements
+
+    # The cursor resumes right after the first page
+    rest, next_cursor = await ProductService(session).get_all_keyset(
+        cursor=next_cursor, limit=PAGE_SIZE, category_id=catalog["category_id"]
+    )
+    assert len(rest) == 1
+    assert rest[0].id not in {product.id for product in body}
+    assert next_cursor is None